@@ -0,0 +1,67 @@
+"""
+This module splits the command line arguments of the scripts into
+positional arguments and options.
+"""
+
+
+def parse_arguments(argv: list, flag_options: tuple = (),
+                    value_options: tuple = (),
+                    positional_count: int | None = None) -> tuple | None:
+    """
+    Split the command line arguments into positional arguments and options.
+
+    Args:
+        argv (list): Command line arguments without the script name.
+        flag_options (tuple): Options without a value, e.g. --quiet.
+        value_options (tuple): Options followed by a value, e.g. --workers 4.
+        positional_count (int | None): Number of positional arguments
+            required, any number if None.
+
+    Returns:
+        tuple | None: List of positional arguments and dictionary of options
+        keyed by the option name without dashes, or None if an option is
+        unknown or misses its value, or the positional arguments are not
+        positional_count.
+    """
+    positional = []
+    options = {}
+    args = iter(argv)
+    for arg in args:
+        if arg in flag_options:
+            options[arg[2:]] = True
+        elif arg in value_options:
+            value = next(args, None)
+            if value is None:
+                print(f"Error: Option {arg} requires a value.")
+                return None
+            options[arg[2:]] = value
+        elif arg.startswith("--"):
+            print(f"Error: Unknown option {arg}.")
+            return None
+        else:
+            positional.append(arg)
+    if positional_count is not None and len(positional) != positional_count:
+        print("Error: Invalid quantity of arguments. Please check.")
+        return None
+    return positional, options
+
+
+def parse_workers(options: dict) -> int | None:
+    """
+    Validate the --workers option.
+
+    Args:
+        options (dict): Options returned by parse_arguments.
+
+    Returns:
+        int | None: Number of processes, 1 by default, or None if it is not
+        a positive integer.
+    """
+    try:
+        workers = int(options.get('workers', 1))
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        print("Error: --workers must be a positive integer.")
+        return None
+    return workers
@@ -0,0 +1,278 @@
+"""
+Module to run one of the analyses of the exercise (statistics, number
+conversion or word count) over many input files in a single launch.
+"""
+import glob
+import lzma
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from arguments import parse_arguments, parse_workers
+from compute_statistics import ComputeStatistics, compute_stats
+from convert_numbers import ConvertNumbers
+from word_count import CountWords
+
+VALUE_OPTIONS = ("--workers",)
+# Problem directory and results file of every analysis
+ANALYSES = {
+    "statistics": ("P1", "StatisticsResults.txt"),
+    "convert": ("P2", "ConvertionResults.txt"),
+    "wordcount": ("P3", "WordCountResults.txt"),
+}
+INPUT_EXTENSIONS = (".txt", ".f64", ".txt.gz", ".txt.bz2", ".txt.xz")
+INDEX_FILE = "BatchIndex.txt"
+
+
+def result_name(path: str) -> str:
+    """
+    Name of the results directory of an input file, as in the scripts.
+
+    Args:
+        path (str): Path of the input file.
+
+    Returns:
+        str: File name up to its first dot.
+    """
+    return os.path.basename(path).split('.')[0]
+
+
+def find_input_files(patterns: list) -> list:
+    """
+    List the input files given as paths, glob patterns or directories.
+
+    Directories are expanded to their .txt files, also compressed with
+    gzip, bzip2 or xz, and .f64 files. The expected results of the test
+    cases (files with "Results" in the name) are skipped in directories
+    and glob matches. Paths without a glob pattern are kept even if they
+    do not exist.
+
+    Args:
+        patterns (list): Paths, glob patterns or directories.
+
+    Returns:
+        list: Paths of the input files, without repetitions.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths += sorted(
+                os.path.join(pattern, name) for name in os.listdir(pattern)
+                if name.endswith(INPUT_EXTENSIONS) and "Results" not in name
+                and os.path.isfile(os.path.join(pattern, name)))
+        elif any(char in pattern for char in "*?["):
+            paths += sorted(path for path in glob.glob(pattern, recursive=True)
+                            if "Results" not in os.path.basename(path)
+                            and os.path.isfile(path))
+        else:
+            # Kept even if missing, so it is reported as failed
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def check_result_names(analysis: str, paths: list) -> bool:
+    """
+    Check that no two input files save the same results directory, as
+    result_name keeps the file name up to its first dot.
+
+    Args:
+        analysis (str): Analysis from ANALYSES.
+        paths (list): Paths of the input files.
+
+    Returns:
+        bool: Whether every file has its own results directory. The files
+        that share one are printed otherwise.
+    """
+    problem = ANALYSES[analysis][0]
+    paths_by_name = {}
+    for path in paths:
+        paths_by_name.setdefault(result_name(path), []).append(path)
+    unique = True
+    for name, name_paths in paths_by_name.items():
+        if len(name_paths) > 1:
+            print(f"Error: {', '.join(name_paths)} would save the same "
+                  f"results/{problem}/{name}/.")
+            unique = False
+    return unique
+
+
+def _run_statistics(path: str, output: str, start_time: float) -> bool:
+    """
+    Compute and save the statistics of a file.
+
+    Args:
+        path (str): Path of the input file.
+        output (str): Path of the results file.
+        start_time (float): Time the file started to be processed.
+
+    Returns:
+        bool: Whether the file was processed.
+    """
+    compute_statistics = ComputeStatistics(path)
+    stats = compute_stats(compute_statistics, {}, (), 0.01)
+    if stats is None:
+        return False
+    compute_statistics.save_stats(output, stats, time.time() - start_time)
+    return True
+
+
+def _run_convert(path: str, output: str, start_time: float) -> bool:
+    """
+    Convert and save the numbers of a file.
+
+    Args:
+        path (str): Path of the input file.
+        output (str): Path of the results file.
+        start_time (float): Time the file started to be processed.
+
+    Returns:
+        bool: Whether the file was processed.
+    """
+    convert_numbers = ConvertNumbers(path)
+    batches = convert_numbers.iter_batches()
+    if batches is None:
+        return False
+    return convert_numbers.save_conversions(output, batches, start_time,
+                                            verbose=False) is not None
+
+
+def _run_wordcount(path: str, output: str, start_time: float) -> bool:
+    """
+    Count and save the words of a file.
+
+    Args:
+        path (str): Path of the input file.
+        output (str): Path of the results file.
+        start_time (float): Time the file started to be processed.
+
+    Returns:
+        bool: Whether the file was processed.
+    """
+    if not os.path.isfile(path):
+        print(f"Error: File {path} not found.")
+        return False
+    word_count = CountWords(path)
+    words_with_freq = word_count.read_data_and_count_words()
+    word_count.save_results(words_with_freq, output, start_time,
+                            verbose=False)
+    return True
+
+
+RUNNERS = {
+    "statistics": _run_statistics,
+    "convert": _run_convert,
+    "wordcount": _run_wordcount,
+}
+
+
+def _run_file(task: tuple) -> tuple:
+    """
+    Run an analysis over a file and save its results. Files that cannot
+    be read are reported and marked as failed in the index.
+
+    Args:
+        task (tuple): Analysis and path of the input file.
+
+    Returns:
+        tuple: Path, results name, whether it was processed and execution
+        time of the file.
+    """
+    analysis, path = task
+    start_time = time.time()
+    problem, results_file = ANALYSES[analysis]
+    name = result_name(path)
+    output = f"results/{problem}/{name}/{results_file}"
+    try:
+        processed = RUNNERS[analysis](path, output, start_time)
+    except (OSError, ValueError, EOFError, lzma.LZMAError) as e:
+        # E.g. a file that is not UTF-8 or a corrupt compressed file, which
+        # must not stop the rest of the batch
+        print(f"Error processing the file {path}: {e}")
+        processed = False
+    return path, name, processed, time.time() - start_time
+
+
+def save_index(filename: str, results: list, execution_time: float) -> None:
+    """
+    Save and print the index of a batch with the timings of every file.
+
+    Args:
+        filename (str): Filename path of the index.
+        results (list): Path, results name, whether it was processed and
+            execution time of every file.
+        execution_time (float): Execution time of the whole batch.
+    """
+    lines = ["FILE\tNAME\tSTATUS\tTIME"]
+    lines += [f"{path}\t{name}\t{'ok' if processed else 'error'}"
+              f"\t{elapsed:.6f}"
+              for path, name, processed, elapsed in results]
+    failed = sum(1 for _, _, processed, _ in results if not processed)
+    lines += ["", f"Files: {len(results)}", f"Failed: {failed}",
+              f"Files time: {sum(elapsed for *_, elapsed in results):.6f}s.",
+              f"Execution time: {execution_time:.6f}s."]
+    index_text = "\n".join(lines) + "\n"
+    print(index_text)
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(index_text)
+    except OSError as e:
+        print(f"Error writing the file {filename}: {e}")
+
+
+def run_batch(analysis: str, paths: list, workers: int = 1) -> list:
+    """
+    Run an analysis over many files, in a pool of processes if there is
+    more than one worker, so the interpreter starts and imports only once
+    per worker. Each file gets its results under results/P1|P2|P3/<name>/
+    and the index of the batch is saved next to them in INDEX_FILE.
+
+    Args:
+        analysis (str): Analysis from ANALYSES.
+        paths (list): Paths of the input files.
+        workers (int): Number of files processed concurrently.
+
+    Returns:
+        list: Path, results name, whether it was processed and execution
+        time of every file.
+    """
+    start_time = time.time()
+    tasks = [(analysis, path) for path in paths]
+    if workers > 1:
+        with Pool(workers) as pool:
+            results = pool.map(_run_file, tasks,
+                               chunksize=max(1, len(tasks) // (workers * 4)))
+    else:
+        results = [_run_file(task) for task in tasks]
+    execution_time = time.time() - start_time
+    problem = ANALYSES[analysis][0]
+    save_index(f"results/{problem}/{INDEX_FILE}", results, execution_time)
+    return results
+
+
+def main():
+    """
+    Main function to run an analysis over a batch of files.
+    """
+    arguments = parse_arguments(sys.argv[1:], value_options=VALUE_OPTIONS)
+    if arguments is None:
+        return
+    args, options = arguments
+    if len(args) < 2 or args[0] not in ANALYSES:
+        print(f"Error: Usage: batch_runner.py {'|'.join(ANALYSES)} "
+              "INPUT... [--workers N]")
+        return
+    workers = parse_workers(options)
+    if workers is None:
+        return
+    paths = find_input_files(args[1:])
+    if not paths:
+        print("Error: No input files found.")
+        return
+    if check_result_names(args[0], paths):
+        run_batch(args[0], paths, workers)
+
+
+if __name__ == "__main__":
+    main()
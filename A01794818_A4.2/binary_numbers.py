@@ -0,0 +1,142 @@
+"""
+This module stores parsed numbers in a compact binary file of float64
+values, so later runs can map the file in memory instead of parsing the
+text again.
+
+The file starts with a 24-byte header: the magic bytes, the format version,
+the parsing rules used to read the text (see RULES) and the count of
+numbers. The numbers follow as little-endian float64 values.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b"NUMF64\r\n"
+VERSION = 1
+HEADER = struct.Struct("<8sHH4xQ")
+# Parsing rules of ComputeStatistics and ConvertNumbers
+RULES = ("statistics", "convert")
+# Numbers written at once
+WRITE_BATCH_SIZE = 1 << 16
+
+
+def is_binary_numbers(filename: str) -> bool:
+    """
+    Check if a file is a binary numbers file.
+
+    Args:
+        filename (str): Path of the file.
+
+    Returns:
+        bool: True if the file starts with the magic bytes.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_numbers(filename: str, numbers, rules: str) -> int:
+    """
+    Write numbers to a binary numbers file.
+
+    Args:
+        filename (str): Path of the file to write.
+        numbers: Iterable of numbers, consumed only once.
+        rules (str): Parsing rules used to read the numbers, from RULES.
+
+    Returns:
+        int: Count of numbers written.
+    """
+    count = 0
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RULES.index(rules), 0))
+        batch = array('d')
+        for number in numbers:
+            batch.append(number)
+            if len(batch) == WRITE_BATCH_SIZE:
+                count += _write_batch(f, batch)
+                batch = array('d')
+        count += _write_batch(f, batch)
+        # The count is only known at the end
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, RULES.index(rules), count))
+    return count
+
+
+def _write_batch(f, batch: array) -> int:
+    """
+    Write a batch of numbers as little-endian float64 values.
+
+    Args:
+        f: Binary file open for writing.
+        batch (array): Numbers to write.
+
+    Returns:
+        int: Count of numbers written.
+    """
+    if sys.byteorder != "little":
+        batch.byteswap()
+    batch.tofile(f)
+    return len(batch)
+
+
+def load_numbers(filename: str) -> tuple:
+    """
+    Map a binary numbers file in memory.
+
+    The numbers are not copied: the returned memoryview reads them from the
+    page cache, so loading takes the same time for any file size.
+
+    Args:
+        filename (str): Path of the file.
+
+    Returns:
+        tuple: Parsing rules of the file and read-only memoryview of its
+        numbers as floats.
+
+    Raises:
+        ValueError: If the file is not a valid binary numbers file.
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{filename} is not a binary numbers file.")
+        magic, version, rules, count = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or rules >= len(RULES):
+            raise ValueError(f"{filename} is not a binary numbers file.")
+        end = HEADER.size + count * 8
+        if os.fstat(f.fileno()).st_size < end:
+            raise ValueError(f"{filename} is truncated.")
+        if sys.byteorder != "little":
+            numbers = array('d')
+            numbers.fromfile(f, count)
+            numbers.byteswap()
+            return RULES[rules], memoryview(numbers)
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return RULES[rules], memoryview(mapped)[HEADER.size:end].cast('d')
+
+
+def read_binary_numbers(filename: str, rules: str) -> memoryview | None:
+    """
+    Map a binary numbers file in memory, printing the errors.
+
+    Args:
+        filename (str): Path of the file.
+        rules (str): Parsing rules expected by the caller, from RULES.
+
+    Returns:
+        memoryview | None: Read-only buffer of the numbers, or None if the
+        file is not valid.
+    """
+    try:
+        file_rules, numbers = load_numbers(filename)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return None
+    if file_rules != rules:
+        print(f"Warning: {filename} was read with the {file_rules} rules.")
+    return numbers
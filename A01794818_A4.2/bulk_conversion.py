@@ -0,0 +1,521 @@
+"""
+This module converts batches of integers to binary and hexadecimal at once,
+for the results table of convert_numbers.py.
+
+By default the conversions are the ones of ConvertNumbers.number_to_binary
+and number_to_hexadecimal. With a width from WIDTHS every number gets its
+two's complement of that many bits instead, so all the rows have the same
+length.
+
+With NumPy the digits of every byte of the numbers are looked up in tables
+built once per format and the rows of the table are assembled as a matrix
+of characters, so no Python code runs per number. Without NumPy, or for
+numbers that do not fit in 64 bits, every column is formatted with format().
+"""
+from functools import cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, conversion falls back to format()
+    np = None
+
+# Numbers converted and written at once
+CONVERT_BATCH_SIZE = 1 << 16
+# Bits of the binary column and mask of the hexadecimal column without a
+# width, as in ConvertNumbers.number_to_binary and number_to_hexadecimal
+BINARY_BITS = 10
+HEX_MASK = 0xFFFFFFFF
+# Character of the matrices removed when joining the rows
+_FILL = 0
+# Widths of the two's complement conversions
+WIDTHS = (8, 16, 32, 64)
+# Formats of the digits of a byte in the binary and hexadecimal tables
+BINARY_DIGITS = '08b'
+HEX_DIGITS = '02X'
+
+
+def to_integers(numbers):
+    """
+    Truncate numbers to integers, skipping the ones that are not finite.
+
+    Args:
+        numbers: Sequence of numbers.
+
+    Returns:
+        NumPy int64 array of the integers, or a list of them without NumPy
+        or if some of them do not fit in 64 bits.
+    """
+    if np is None:
+        return _to_integer_list(numbers)
+    values = np.asarray(numbers, dtype=np.float64)
+    finite = np.isfinite(values)
+    if not finite.all():
+        for number in values[~finite].tolist():
+            print(f"Invalid number: {number}. Skipping...")
+        values = values[finite]
+    if values.size and np.abs(values).max() >= 2.0 ** 63:
+        return [int(number) for number in values.tolist()]
+    return values.astype(np.int64)
+
+
+def _to_integer_list(numbers) -> list:
+    """
+    Truncate numbers to integers with int(), skipping the ones that are not
+    finite.
+
+    Args:
+        numbers: Iterable of numbers.
+
+    Returns:
+        list: Integers.
+    """
+    integers = []
+    for number in numbers:
+        try:
+            integers.append(int(number))
+        except (ValueError, OverflowError):
+            print(f"Invalid number: {number}. Skipping...")
+    return integers
+
+
+def unique_integers(integers):
+    """
+    Drop the repeated integers, keeping the first occurrence of each one.
+
+    Args:
+        integers: Integers from to_integers.
+
+    Returns:
+        The integers without repetitions, in the same order and container.
+    """
+    if isinstance(integers, list):
+        return list(dict.fromkeys(integers))
+    _, first = np.unique(integers, return_index=True)
+    return integers[np.sort(first)]
+
+
+def drop_seen(integers, seen: set):
+    """
+    Drop the repeated integers of a batch and the ones seen in the previous
+    batches, keeping the first occurrence of each one.
+
+    Args:
+        integers: Integers from to_integers.
+        seen (set): Integers of the previous batches, updated in place.
+
+    Returns:
+        The new integers, in the same order and container.
+    """
+    integers = unique_integers(integers)
+    if isinstance(integers, list):
+        integers = [number for number in integers if number not in seen]
+        seen.update(integers)
+        return integers
+    values = integers.tolist()
+    if seen:
+        new = np.fromiter((number not in seen for number in values),
+                          dtype=bool, count=len(values))
+        integers = integers[new]
+        values = integers.tolist()
+    seen.update(values)
+    return integers
+
+
+def fit_width(integers, width: int):
+    """
+    Drop the integers that do not fit in a two's complement width.
+
+    Args:
+        integers: Integers from to_integers.
+        width (int): Bits of the two's complement, from WIDTHS.
+
+    Returns:
+        The integers that fit, in the same order and container.
+    """
+    lowest, highest = -(1 << (width - 1)), (1 << (width - 1)) - 1
+    if isinstance(integers, list):
+        fitting = []
+        for number in integers:
+            if lowest <= number <= highest:
+                fitting.append(number)
+            else:
+                print(f"Number {number} does not fit in {width} bits. "
+                      "Skipping...")
+        return fitting
+    fits = (integers >= lowest) & (integers <= highest)
+    if not fits.all():
+        for number in integers[~fits].tolist():
+            print(f"Number {number} does not fit in {width} bits. Skipping...")
+        integers = integers[fits]
+    return integers
+
+
+def parse_width(value: str) -> int | None:
+    """
+    Parse the two's complement width of the conversions.
+
+    Args:
+        value (str): Value of the --width option.
+
+    Returns:
+        int | None: Width, or None if it is not one of WIDTHS.
+    """
+    try:
+        width = int(value)
+    except ValueError:
+        width = 0
+    if width not in WIDTHS:
+        print(f"Error: --width must be one of {', '.join(map(str, WIDTHS))}.")
+        return None
+    return width
+
+
+def convert_batch(integers, width: int | None = None) -> tuple:
+    """
+    Convert integers to binary and hexadecimal.
+
+    Without a width, negative numbers get the two's complement of
+    BINARY_BITS bits in binary and of 32 bits in hexadecimal, and the
+    positive ones their plain digits, as ConvertNumbers.number_to_binary and
+    number_to_hexadecimal. With a width, every number gets its two's
+    complement of that many bits in both bases.
+
+    Args:
+        integers: Integers from to_integers, fitting in the width if any.
+        width (int | None): Bits of the two's complement, from WIDTHS.
+
+    Returns:
+        tuple: Lists of the binary and hexadecimal strings.
+    """
+    if not _vectorized(integers, width):
+        return _column_lists(integers, width)
+    binaries, hexadecimals = _column_matrices(integers, width)
+    return (_join_rows([binaries, b'\n']).split('\n')[:-1],
+            _join_rows([hexadecimals, b'\n']).split('\n')[:-1])
+
+
+def format_rows(integers, first_item: int, width: int | None = None) -> str:
+    """
+    Format the rows of the results table: item, number, binary and
+    hexadecimal separated by tabs.
+
+    Args:
+        integers: Integers from to_integers, fitting in the width if any.
+        first_item (int): Item of the first row.
+        width (int | None): Bits of the two's complement, see convert_batch.
+
+    Returns:
+        str: Rows of the table, each one ending with a newline.
+    """
+    if not _vectorized(integers, width):
+        return "".join(
+            f"{idx}\t{number}\t{binary}\t{hexadecimal}\n"
+            for idx, (number, binary, hexadecimal) in enumerate(
+                zip(integers, *_column_lists(integers, width)),
+                start=first_item))
+    items = np.arange(first_item, first_item + len(integers), dtype=np.int64)
+    binaries, hexadecimals = _column_matrices(integers, width)
+    return _join_rows([_decimal_matrix(items), b'\t',
+                       _decimal_matrix(integers), b'\t',
+                       binaries, b'\t', hexadecimals, b'\n'])
+
+
+def format_conversions(integers, width: int | None = None) -> str:
+    """
+    Format the conversions as printed by convert_numbers.py.
+
+    Args:
+        integers: Integers from to_integers, fitting in the width if any.
+        width (int | None): Bits of the two's complement, see convert_batch.
+
+    Returns:
+        str: A line per integer, each one ending with a newline.
+    """
+    if not _vectorized(integers, width):
+        return "".join(
+            f"Number: {number} -> Binary: {binary} "
+            f"-> Hexadecimal: {hexadecimal}\n"
+            for number, binary, hexadecimal in zip(
+                integers, *_column_lists(integers, width)))
+    binaries, hexadecimals = _column_matrices(integers, width)
+    return _join_rows([b'Number: ', _decimal_matrix(integers),
+                       b' -> Binary: ', binaries,
+                       b' -> Hexadecimal: ', hexadecimals, b'\n'])
+
+
+def _column_lists(integers, width: int | None) -> tuple:
+    """
+    Convert integers to the binary and hexadecimal columns without NumPy.
+
+    Args:
+        integers: Integers.
+        width (int | None): Bits of the two's complement, see convert_batch.
+
+    Returns:
+        tuple: Lists of the binary and hexadecimal strings.
+    """
+    if width is None:
+        return _binary_list(integers, BINARY_BITS), _hex_list(integers)
+    return (_fixed_list(integers, width, BINARY_DIGITS),
+            _fixed_list(integers, width, HEX_DIGITS))
+
+
+def _column_matrices(integers, width: int | None) -> tuple:
+    """
+    Convert integers to the binary and hexadecimal columns with the lookup
+    tables.
+
+    Args:
+        integers: NumPy int64 array.
+        width (int | None): Bits of the two's complement, see convert_batch.
+
+    Returns:
+        tuple: NumPy uint8 matrices with the characters of a number per row.
+    """
+    if width is None:
+        return _binary_matrix(integers, BINARY_BITS), _hex_matrix(integers)
+    return (_fixed_matrix(integers, width, BINARY_DIGITS),
+            _fixed_matrix(integers, width, HEX_DIGITS))
+
+
+def _binary_list(integers, bits: int) -> list:
+    """
+    Convert integers to binary with format(), as
+    ConvertNumbers.number_to_binary.
+
+    Args:
+        integers: Integers.
+        bits (int): Bits of the binary representation.
+
+    Returns:
+        list: Binary strings.
+    """
+    positive, negative = f'{bits}b', f'0{bits}b'
+    return [format(number, positive) if number >= 0
+            else format((1 << bits) + number, negative)
+            for number in integers]
+
+
+def _hex_list(integers) -> list:
+    """
+    Convert integers to hexadecimal with format(), as
+    ConvertNumbers.number_to_hexadecimal.
+
+    Args:
+        integers: Integers.
+
+    Returns:
+        list: Hexadecimal strings.
+    """
+    return [format(number, 'X') if number >= 0
+            else format(number & HEX_MASK, '08X')
+            for number in integers]
+
+
+def _vectorized(integers, width: int | None) -> bool:
+    """
+    Check if the integers can be converted with the lookup tables: they are
+    in a NumPy array and, without a width, the negative ones fit in
+    BINARY_BITS.
+
+    Args:
+        integers: Integers from to_integers.
+        width (int | None): Bits of the two's complement, see convert_batch.
+
+    Returns:
+        bool: True if the integers can be converted with the tables.
+    """
+    if isinstance(integers, list):
+        return False
+    return width is not None or not integers.size \
+        or integers.min() >= -(1 << BINARY_BITS)
+
+
+def _fixed_list(integers, width: int, digits: str) -> list:
+    """
+    Convert integers to their two's complement of a width with format().
+
+    Args:
+        integers: Integers fitting in the width.
+        width (int): Bits of the two's complement, from WIDTHS.
+        digits (str): Format of the digits of a byte, BINARY_DIGITS or
+            HEX_DIGITS.
+
+    Returns:
+        list: Strings of the same length.
+    """
+    # Digits of a byte times the bytes of the width, e.g. '08b' -> '064b'
+    fixed = f"0{int(digits[:-1]) * width // 8}{digits[-1]}"
+    mask = (1 << width) - 1
+    return [format(number & mask, fixed) for number in integers]
+
+
+def _fixed_matrix(integers, width: int, digits: str):
+    """
+    Convert integers to their two's complement of a width as _fixed_list,
+    with the lookup tables.
+
+    Args:
+        integers: NumPy int64 array, fitting in the width.
+        width (int): Bits of the two's complement, from WIDTHS.
+        digits (str): Format of the digits of a byte, BINARY_DIGITS or
+            HEX_DIGITS.
+
+    Returns:
+        NumPy uint8 matrix with the characters of a number per row.
+    """
+    size = width // 8
+    table = byte_table(digits)
+    # The last bytes of the int64 two's complement are the ones of the width
+    data = integers.astype('>i8').view(np.uint8).reshape(
+        len(integers), 8)[:, 8 - size:]
+    return table[data].reshape(len(integers), size * table.shape[1])
+
+
+@cache
+def byte_table(digits: str):
+    """
+    Build the lookup table of the digits of every byte value, once per
+    format.
+
+    Args:
+        digits (str): Format of the digits of a byte, BINARY_DIGITS or
+            HEX_DIGITS.
+
+    Returns:
+        NumPy uint8 matrix with the characters of a byte value per row.
+    """
+    return np.array([list(format(byte, digits).encode('ascii'))
+                     for byte in range(256)], dtype=np.uint8)
+
+
+def _digit_matrix(values, table, minimum: int = 1):
+    """
+    Look up the digits of every byte of the values, from the most
+    significant one. The bytes that are zero in every value are left out.
+
+    Args:
+        values: NumPy uint64 array.
+        table: Digits of every byte value, from byte_table.
+        minimum (int): Minimum count of bytes looked up.
+
+    Returns:
+        NumPy uint8 matrix with the characters of a value per row.
+    """
+    size = max(minimum, (int(values.max(initial=0)).bit_length() + 7) // 8)
+    data = values.astype('>u8').view(np.uint8).reshape(
+        len(values), 8)[:, 8 - size:]
+    return table[data].reshape(len(values), size * table.shape[1])
+
+
+def _strip_zeros(matrix, widths, pads):
+    """
+    Replace the leading zeros of every row with its padding character up to
+    its width, and remove the rest. The last digit is always kept.
+
+    Args:
+        matrix: NumPy uint8 matrix with the digits of a value per row.
+        widths: Minimum width of every row.
+        pads: Padding character of every row.
+
+    Returns:
+        NumPy uint8 matrix without the columns removed in every row.
+    """
+    size = matrix.shape[1]
+    significant = matrix != ord('0')
+    first = np.where(significant.any(axis=1), significant.argmax(axis=1),
+                     size - 1)
+    start = np.maximum(np.minimum(first, size - widths), 0)
+    offset = int(start.min(initial=0))
+    columns = np.arange(offset, size)
+    padded = np.where(columns < start[:, None], _FILL, pads[:, None])
+    return np.where(columns < first[:, None], padded, matrix[:, offset:])
+
+
+def _binary_matrix(integers, bits: int):
+    """
+    Convert integers to binary as _binary_list, with the lookup tables.
+
+    Args:
+        integers: NumPy int64 array, negative numbers fitting in the bits.
+        bits (int): Bits of the binary representation.
+
+    Returns:
+        NumPy uint8 matrix with the characters of a number per row.
+    """
+    negative = integers < 0
+    values = np.where(negative, integers + (1 << bits), integers)
+    matrix = _digit_matrix(values.astype(np.uint64), byte_table(BINARY_DIGITS),
+                           (bits + 7) // 8)
+    widths = np.full(len(integers), bits)
+    pads = np.where(negative, ord('0'), ord(' ')).astype(np.uint8)
+    return _strip_zeros(matrix, widths, pads)
+
+
+def _hex_matrix(integers):
+    """
+    Convert integers to hexadecimal as _hex_list, with the lookup tables.
+
+    Args:
+        integers: NumPy int64 array.
+
+    Returns:
+        NumPy uint8 matrix with the characters of a number per row.
+    """
+    negative = integers < 0
+    values = np.where(negative, integers & HEX_MASK, integers)
+    matrix = _digit_matrix(values.astype(np.uint64), byte_table(HEX_DIGITS))
+    widths = np.where(negative, 8, 1)
+    pads = np.full(len(integers), ord('0'), dtype=np.uint8)
+    return _strip_zeros(matrix, widths, pads)
+
+
+def _decimal_matrix(integers):
+    """
+    Convert integers to decimal, with the minus sign of negative numbers.
+
+    Args:
+        integers: NumPy int64 array.
+
+    Returns:
+        NumPy uint8 matrix with the characters of a number per row.
+    """
+    negative = integers < 0
+    unsigned = integers.view(np.uint64)
+    # Two's complement negation also gives the magnitude of the minimum int64
+    magnitudes = np.where(negative, ~unsigned + np.uint64(1), unsigned)
+    count = len(str(int(magnitudes.max()))) if len(magnitudes) else 1
+    powers = 10 ** np.arange(count - 1, -1, -1, dtype=np.uint64)
+    digits = (magnitudes[:, None] // powers % np.uint64(10)
+              + np.uint64(ord('0'))).astype(np.uint8)
+    widths = np.ones(len(integers), dtype=np.int64)
+    pads = np.full(len(integers), _FILL, dtype=np.uint8)
+    signs = np.where(negative, ord('-'), _FILL).astype(np.uint8)
+    return np.hstack([signs[:, None], _strip_zeros(digits, widths, pads)])
+
+
+def _join_rows(columns: list) -> str:
+    """
+    Join character matrices and constant texts side by side into rows.
+
+    Args:
+        columns (list): NumPy uint8 matrices with a row per number, or bytes
+            repeated in every row.
+
+    Returns:
+        str: Text of the rows, without the fill characters.
+    """
+    count = next(len(column) for column in columns
+                 if not isinstance(column, bytes))
+    widths = [len(column) if isinstance(column, bytes) else column.shape[1]
+              for column in columns]
+    rows = np.empty((count, sum(widths)), dtype=np.uint8)
+    position = 0
+    for column, width in zip(columns, widths):
+        if isinstance(column, bytes):
+            rows[:, position:position + width] = np.frombuffer(
+                column, dtype=np.uint8)
+        else:
+            rows[:, position:position + width] = column
+        position += width
+    return rows.tobytes().translate(None, b'\0').decode('ascii')
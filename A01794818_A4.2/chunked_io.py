@@ -0,0 +1,155 @@
+"""
+This module splits text files into newline-aligned byte ranges and blocks,
+so they can be parsed in bulk or processed independently, e.g. by a pool
+of processes. Files compressed with gzip, bzip2 or xz are decompressed
+while they are read.
+"""
+import bz2
+import gzip
+import lzma
+import os
+import re
+
+# Target size of a byte range, so a range always fits in memory
+CHUNK_SIZE = 1 << 24
+# Size of the binary blocks read at once. Every block is turned into a list
+# of lines or words, so larger blocks (4-16 MB) only add memory and were
+# slower in the measurements of the three scripts
+BLOCK_SIZE = 1 << 20
+# Leading bytes of every compressed format and the function opening it
+COMPRESSED_FORMATS = (
+    (re.compile(rb'\x1f\x8b'), gzip.open),
+    (re.compile(rb'BZh[1-9](?:1AY&SY|\x17rE8P\x90)'), bz2.open),
+    (re.compile(rb'\xfd7zXZ\x00'), lzma.open),
+)
+
+
+def compressed_opener(filename: str):
+    """
+    Detect whether a file is compressed from its leading bytes.
+
+    Args:
+        filename (str): Path of the file.
+
+    Returns:
+        The function that opens the file decompressing it, or None if the
+        file is not compressed.
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(10)
+    for magic, opener in COMPRESSED_FORMATS:
+        if magic.match(header):
+            return opener
+    return None
+
+
+def open_binary(filename: str):
+    """
+    Open a file for binary reading, decompressing it if it is compressed.
+
+    Args:
+        filename (str): Path of the file.
+
+    Returns:
+        File object reading the (decompressed) bytes of the file.
+    """
+    opener = compressed_opener(filename)
+    if opener is None:
+        return open(filename, 'rb')  # pylint: disable=consider-using-with
+    return opener(filename, 'rb')
+
+
+def split_file(filename: str, chunks: int) -> list:
+    """
+    Split a file into byte ranges that start and end on line boundaries.
+
+    A compressed file cannot be read from an offset without decompressing
+    everything before it, so it is a single range (0, None).
+
+    Args:
+        filename (str): Path of the file.
+        chunks (int): Number of ranges wanted. More ranges are made if the
+            ranges would be bigger than CHUNK_SIZE.
+
+    Returns:
+        list: Tuples (start, end) of byte offsets covering the whole file.
+    """
+    if compressed_opener(filename) is not None:
+        return [(0, None)]
+    size = os.path.getsize(filename)
+    chunks = max(1, chunks, -(-size // CHUNK_SIZE))
+    bounds = [0]
+    with open(filename, 'rb') as f:
+        for chunk in range(1, chunks):
+            offset = max(size * chunk // chunks, bounds[-1])
+            if offset >= size:
+                break
+            # Move to the start of the line after the one holding offset - 1
+            f.seek(max(offset - 1, 0))
+            f.readline()
+            bounds.append(f.tell())
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:])
+            if start < end]
+
+
+def iter_blocks(filename: str, start: int = 0, end: int | None = None,
+                block_size: int = BLOCK_SIZE):
+    """
+    Read a byte range of a file in large binary blocks that end on line
+    boundaries, so no line is split between two blocks.
+
+    Compressed files are decompressed, and the range is then of their
+    decompressed bytes.
+
+    Args:
+        filename (str): Path of the file.
+        start (int): First byte of the range, at a line start.
+        end (int | None): Byte after the range, the file end if None.
+        block_size (int): Bytes read at once.
+
+    Yields:
+        bytes: Each block, made of whole lines.
+    """
+    with open_binary(filename) as f:
+        f.seek(start)
+        remaining = None if end is None else end - start
+        pending = b''
+        while remaining is None or remaining > 0:
+            data = f.read(block_size if remaining is None
+                          else min(block_size, remaining))
+            if not data:
+                break
+            if remaining is not None:
+                remaining -= len(data)
+            cut = data.rfind(b'\n') + 1
+            if cut == 0:
+                pending += data
+                continue
+            yield pending + data[:cut]
+            pending = data[cut:]
+        if pending:
+            yield pending
+
+
+def split_lines(block: bytes) -> list:
+    """
+    Decode a block of UTF-8 text and split it into lines.
+
+    Newlines are translated as in text mode, so the lines are the same as
+    when iterating the file opened with open(filename, 'r'), without the
+    line endings.
+
+    Args:
+        block (bytes): Block of whole lines.
+
+    Returns:
+        list: Lines of the block.
+    """
+    text = block.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
@@ -1,96 +1,667 @@
 """
 This module computes several statistics from a list of numbers.
 """
+import json
 import math
 import os
 import sys
 import time
+from array import array
+from itertools import chain, islice
+from multiprocessing import Pool
 from typing import Counter
 
+from arguments import parse_arguments, parse_workers
+from binary_numbers import (is_binary_numbers, read_binary_numbers,
+                            write_numbers)
+from chunked_io import split_file
+from number_parsing import (finish_storage, new_storage, parse_storage,
+                            read_numbers)
+from order_statistics import (interpolate_quantiles, largest_mode,
+                              middle_ranks, middle_value, order_ranks,
+                              quantile_positions, select_ranks)
+from sketches import KLLSketch, MisraGries
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only needed by the numpy storage
+    np = None
+
+FLAG_OPTIONS = ("--single-pass", "--approximate", "--merge-sketches")
+VALUE_OPTIONS = ("--percentiles", "--error", "--sketch", "--workers",
+                 "--save-binary", "--storage")
+# Results directory of --merge-sketches, under results/P1
+MERGED_SKETCHES_NAME = "MergedSketches"
+# Numbers fed at once to each accumulator of the approximate mode
+APPROXIMATE_BATCH_SIZE = 1 << 16
+# Numbers of a NumPy array summed at once
+SUM_BATCH_SIZE = 1 << 16
+
+
+def sequential_sum(numbers, center: float | None = None) -> float:
+    """
+    Sum the numbers, or their squared deviations from center, from left to
+    right like the built-in sum(), so the result is the same for every
+    storage. NumPy arrays are summed in batches with numpy.cumsum, which
+    also adds from left to right.
+
+    Args:
+        numbers: Sequence of numbers.
+        center (float | None): Subtracted from every number before squaring
+            it, or None to sum the numbers themselves.
+
+    Returns:
+        float: The sum.
+    """
+    if np is None or not isinstance(numbers, np.ndarray):
+        if center is None:
+            return sum(numbers)
+        return sum((x - center) ** 2 for x in numbers)
+    total = 0.0
+    for start in range(0, len(numbers), SUM_BATCH_SIZE):
+        batch = numbers[start:start + SUM_BATCH_SIZE].copy()
+        if center is not None:
+            batch -= center
+            batch *= batch
+        batch[0] += total
+        total = float(np.cumsum(batch)[-1])
+    return total
+
+
+def empty_stats(percentiles=()) -> tuple:
+    """
+    Statistics of the default mode of a file without numbers.
+
+    Args:
+        percentiles: Percentiles wanted, from 0 to 100.
+
+    Returns:
+        tuple: Statistics and percentiles, all zero.
+    """
+    stats = {'count': 0, 'mean': 0.0, 'median': 0.0, 'mode': 0.0,
+             'variance': 0.0}
+    return stats, {percentile: 0.0 for percentile in percentiles}
+
+
 # pylint: disable=trailing-whitespace
+class StreamingStatistics:
+    """
+    One-pass accumulator of the count, mean, variance, minimum and maximum
+    of a stream of numbers, using Welford's algorithm so it needs O(1)
+    memory and no second pass over the data.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def update(self, numbers) -> None:
+        """
+        Add every number of an iterable to the accumulator.
+
+        Args:
+            numbers: Iterable of numbers, consumed only once.
+        """
+        count, mean, m2 = self.count, self.mean, self.m2
+        minimum, maximum = self.minimum, self.maximum
+        for x in numbers:
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+            if minimum is None or x < minimum:
+                minimum = x
+            if maximum is None or x > maximum:
+                maximum = x
+        self.count, self.mean, self.m2 = count, mean, m2
+        self.minimum, self.maximum = minimum, maximum
+
+    def variance(self) -> float:
+        """
+        Population variance of the numbers added so far.
+
+        Returns:
+            float: Variance of the numbers.
+        """
+        if self.count == 0:
+            return 0.0
+        return self.m2 / self.count
+
+    def standard_deviation(self) -> float:
+        """
+        Population standard deviation of the numbers added so far.
+
+        Returns:
+            float: Standard deviation of the numbers.
+        """
+        return math.sqrt(self.variance())
+
+    def stats(self) -> dict:
+        """
+        Statistics of the numbers added so far.
+
+        Returns:
+            dict: Count, mean, variance, standard deviation, min and max.
+        """
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance(),
+            'standard_deviation': self.standard_deviation(),
+            'min': self.minimum,
+            'max': self.maximum,
+        }
+
+    def merge(self, other: "StreamingStatistics") -> None:
+        """
+        Add the numbers accumulated by another accumulator to this one
+        (Chan et al. formula for the combined variance).
+
+        Args:
+            other (StreamingStatistics): Accumulator to merge.
+        """
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        if self.minimum is None or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if self.maximum is None or other.maximum > self.maximum:
+            self.maximum = other.maximum
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the accumulator.
+
+        Returns:
+            dict: JSON serializable state of the accumulator.
+        """
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.minimum, 'max': self.maximum}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "StreamingStatistics":
+        """
+        Rebuild an accumulator serialized with to_dict.
+
+        Args:
+            state (dict): State of the accumulator.
+
+        Returns:
+            StreamingStatistics: The accumulator.
+        """
+        accumulator = cls()
+        accumulator.count = state['count']
+        accumulator.mean = state['mean']
+        accumulator.m2 = state['m2']
+        accumulator.minimum = state['min']
+        accumulator.maximum = state['max']
+        return accumulator
+
+
+class ApproximateStatistics:
+    """
+    One-pass statistics in bounded memory: exact count, mean, variance, min
+    and max, plus approximate median and percentiles (KLL sketch) and mode
+    (Misra-Gries sketch) within a configurable error. The state can be
+    saved and merged with the state of other files or shards.
+    """
+    def __init__(self, error: float = 0.01):
+        self.moments = StreamingStatistics()
+        self.quantiles = KLLSketch(error)
+        self.frequencies = MisraGries(error)
+
+    def update(self, numbers) -> None:
+        """
+        Add every number of an iterable, consumed only once.
+
+        Args:
+            numbers: Iterable of numbers.
+        """
+        numbers = iter(numbers)
+        while batch := list(islice(numbers, APPROXIMATE_BATCH_SIZE)):
+            self.moments.update(batch)
+            self.quantiles.update(batch)
+            self.frequencies.update(batch)
+
+    def merge(self, other: "ApproximateStatistics") -> None:
+        """
+        Add the numbers summarized by another instance to this one.
+
+        Args:
+            other (ApproximateStatistics): Statistics to merge.
+        """
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.frequencies.merge(other.frequencies)
+
+    def stats(self, percentiles=()) -> dict:
+        """
+        Statistics of the numbers added so far.
+
+        Args:
+            percentiles: Approximate percentiles wanted, from 0 to 100.
+
+        Returns:
+            dict: Count, mean, median, mode, variance, standard deviation,
+            min, max and the percentiles wanted.
+        """
+        moments = self.moments.stats()
+        stats = {
+            'count': moments['count'],
+            'mean': moments['mean'],
+            'median': self.quantiles.quantile(0.5),
+            'mode': self.frequencies.mode(),
+        }
+        stats.update(moments)
+        for percentile in percentiles:
+            stats[f'p{percentile:g}'] = self.quantiles.quantile(percentile / 100)
+        return stats
+
+    def save(self, filename: str) -> None:
+        """
+        Save the state of the statistics as JSON.
+
+        Args:
+            filename (str): Filename path of the state.
+        """
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        state = {
+            'moments': self.moments.to_dict(),
+            'quantiles': self.quantiles.to_dict(),
+            'frequencies': self.frequencies.to_dict(),
+        }
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+
+    @classmethod
+    def load(cls, filename: str) -> "ApproximateStatistics":
+        """
+        Load statistics saved with save.
+
+        Args:
+            filename (str): Filename path of the state.
+
+        Returns:
+            ApproximateStatistics: The statistics.
+        """
+        with open(filename, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        statistics = cls()
+        statistics.moments = StreamingStatistics.from_dict(state['moments'])
+        statistics.quantiles = KLLSketch.from_dict(state['quantiles'])
+        statistics.frequencies = MisraGries.from_dict(state['frequencies'])
+        return statistics
+
+
+def _reduce_range(task: tuple):
+    """
+    Parse a byte range of a file and reduce it to partial statistics.
+
+    Args:
+        task (tuple): Mode, filename, start and end of the range, and error
+            of the approximate mode.
+
+    Returns:
+        tuple: Accumulator of the mode, or in the exact mode the numbers of
+        the range in file order, and the summary of the invalid values of
+        the range.
+    """
+    mode, filename, start, end, error = task
+    summary = Counter()
+    numbers = chain.from_iterable(read_numbers(filename, summary, start, end))
+    if mode == 'approximate':
+        statistics = ApproximateStatistics(error)
+        statistics.update(numbers)
+        return statistics, summary
+    if mode == 'single-pass':
+        accumulator = StreamingStatistics()
+        accumulator.update(numbers)
+        return accumulator, summary
+    return array('d', numbers), summary
+
+
 class ComputeStatistics:
     """
     Class to compute the statistics of a file containing a list of numbers.
     """
-    def __init__(self, filepath):
+    def __init__(self, filepath, storage: str = "list"):
         self.data = filepath
+        # Container of the numbers returned by read_data, see number_parsing.STORAGES
+        self.storage = storage
+        # Counts of the invalid values found while reading the file
+        self.summary = Counter()
+
+    def iter_numbers(self):
+        """
+        Read the numbers from the file one at a time.
+
+        Yields:
+            float: Each number of the file.
+        """
+        if is_binary_numbers(self.data):
+            yield from self.read_binary() or ()
+            return
+        for numbers in read_numbers(self.data, self.summary):
+            yield from numbers
+
+    def read_binary(self) -> memoryview | None:
+        """
+        Map a binary numbers file in memory, without parsing or copying it.
+
+        Returns:
+            memoryview | None: Read-only buffer of the numbers, or None if
+            the file is not valid.
+        """
+        return read_binary_numbers(self.data, 'statistics')
+
+    def save_binary(self, filename: str) -> int | None:
+        """
+        Parse the file once and save its numbers as a binary numbers file,
+        so later runs map it instead of parsing the text.
+
+        Args:
+            filename (str): Filename path of the binary file.
+
+        Returns:
+            int | None: Count of numbers saved, or None if the file is not
+            found.
+        """
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            count = write_numbers(filename, self.iter_numbers(), 'statistics')
+        except FileNotFoundError:
+            print(f"Error: File {self.data} not found.")
+            return None
+        print(f"Saved {count} numbers to {filename}.")
+        return count
 
     def read_data(self) -> list:
         """
         Read the numbers from the file and return the list of numbers.
 
+        The numbers are collected in the container of the storage, and a
+        binary numbers file is mapped instead, see read_binary.
+
         Returns:
-            list: List of numbers.
+            list: List of numbers, or array('d') or NumPy array of them.
         """
-        numbers = []
+        if is_binary_numbers(self.data):
+            return self.read_binary()
+        numbers = new_storage(self.storage)
         try:
-            with open(self.data, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    line = line.replace(',', '.') # Replace comma with dot
-                    line = line.replace(';', '.') # Replace semicolon with dot
-                    try:
-                        numbers.append(float(line))
-                    except ValueError:
-                        # Remove non-numeric characters
-                        print(f"Invalid value: '{line}'. Trying to extract number...")
-                        cleaned_number = ''.join(filter(str.isdigit, line)) 
-                        # Check if the line contains a number
-                        if cleaned_number != '': 
-                            print(f"Extracted number of '{line}': {cleaned_number}")
-                            numbers.append(float(cleaned_number))
-                        else:
-                            print(f"Invalid value: '{line}'. Skipping...")
+            for block_numbers in read_numbers(self.data, self.summary):
+                numbers.extend(block_numbers)
         except FileNotFoundError:
             print(f"Error: File {self.data} not found.")
             return None
-        return numbers
-    
-    def compute_mean(self, numbers: list) -> float:
+        return finish_storage(numbers, self.storage)
+
+    def print_summary(self) -> None:
+        """
+        Print how many invalid values were found while reading the file.
+        """
+        if self.summary['invalid']:
+            print(f"Invalid values: {self.summary['invalid']} "
+                  f"({self.summary['extracted']} numbers extracted, "
+                  f"{self.summary['skipped']} skipped).")
+
+    def iter_partials(self, workers: int, mode: str, error: float = 0.01):
+        """
+        Split the file into newline-aligned byte ranges and reduce each of
+        them to partial statistics in a pool of processes.
+
+        Args:
+            workers (int): Number of processes.
+            mode (str): 'approximate', 'single-pass' or 'exact', see
+                _reduce_range.
+            error (float): Error of the approximate mode.
+
+        Yields:
+            The partial statistics of every range, in file order.
+        """
+        tasks = [(mode, self.data, start, end, error)
+                 for start, end in split_file(self.data, workers)]
+        with Pool(workers) as pool:
+            for partial, summary in pool.imap(_reduce_range, tasks):
+                self.summary.update(summary)
+                yield partial
+
+    def compute_streaming_stats(self, workers: int = 1) -> dict | None:
+        """
+        Compute the count, mean, variance, standard deviation, min and max
+        in a single read of the file, without keeping the numbers in memory.
+
+        Args:
+            workers (int): Number of processes reading the file.
+
+        Returns:
+            dict | None: Statistics, or None if the file is not found.
+        """
+        accumulator = StreamingStatistics()
+        try:
+            if workers > 1:
+                for partial in self.iter_partials(workers, 'single-pass'):
+                    accumulator.merge(partial)
+            else:
+                accumulator.update(self.iter_numbers())
+        except FileNotFoundError:
+            print(f"Error: File {self.data} not found.")
+            return None
+        return accumulator.stats()
+
+    def compute_approximate_stats(self, error: float = 0.01,
+                                  workers: int = 1) -> ApproximateStatistics | None:
+        """
+        Compute the statistics in a single read of the file with bounded
+        memory, approximating the median, percentiles and mode.
+
+        Args:
+            error (float): Relative rank error of the percentiles and count
+                error of the mode, as a fraction of the count.
+            workers (int): Number of processes reading the file.
+
+        Returns:
+            ApproximateStatistics | None: Statistics, or None if the file is
+            not found.
+        """
+        statistics = ApproximateStatistics(error)
+        try:
+            if workers > 1:
+                for partial in self.iter_partials(workers, 'approximate', error):
+                    statistics.merge(partial)
+            else:
+                statistics.update(self.iter_numbers())
+        except FileNotFoundError:
+            print(f"Error: File {self.data} not found.")
+            return None
+        return statistics
+
+    def compute_exact_stats(self, percentiles=(), workers: int = 1) -> tuple | None:
+        """
+        Compute the statistics of the default mode: count, mean, median,
+        mode, variance and percentiles of every number of the file.
+
+        Args:
+            percentiles: Percentiles wanted, from 0 to 100.
+            workers (int): Number of processes parsing a text file.
+
+        Returns:
+            tuple | None: Statistics and percentiles, or None if the file is
+            not found or not valid.
+        """
+        if is_binary_numbers(self.data):
+            numbers = self.read_binary()
+            if numbers is None:
+                return None
+            return self.compute_buffer_stats(numbers, percentiles)
+        if workers > 1:
+            return self.compute_parallel_stats(workers, percentiles)
+        numbers = self.read_data()
+        if numbers is None:
+            return None
+        return self.compute_number_stats(numbers, percentiles)
+
+    def compute_number_stats(self, numbers, percentiles=()) -> tuple:
+        """
+        Compute the statistics of the default mode on the numbers without
+        sorting or modifying them.
+
+        The median and the percentiles come from a single selection of all
+        their ranks, and the mode is the largest of the most frequent
+        values, the one compute_mode finds over the sorted numbers.
+
+        Args:
+            numbers: List, array('d') or NumPy array of numbers.
+            percentiles: Percentiles wanted, from 0 to 100.
+
+        Returns:
+            tuple: Statistics and percentiles.
+        """
+        count = len(numbers)
+        if count == 0:
+            return empty_stats(percentiles)
+        positions = quantile_positions(count, percentiles)
+        selected = select_ranks(numbers, order_ranks(count, positions))
+        stats = {
+            'count': count,
+            'mean': self.compute_mean(numbers),
+            'median': middle_value(selected, count),
+            'mode': largest_mode(numbers),
+            'variance': self.compute_variance(numbers),
+        }
+        return stats, interpolate_quantiles(positions, selected)
+
+    def compute_parallel_stats(self, workers: int, percentiles=()) -> tuple | None:
+        """
+        Compute the statistics of the default mode with a pool of processes.
+
+        Every range of the file is parsed in parallel and sent back as an
+        array('d') of its numbers. The ranges are joined in file order and
+        the statistics computed by compute_buffer_stats, so the mean and
+        variance are added in the same order as in the single-process run
+        and every result is identical to it.
+
+        Args:
+            workers (int): Number of processes.
+            percentiles: Percentiles wanted, from 0 to 100.
+
+        Returns:
+            tuple | None: Statistics and percentiles, or None if the file is
+            not found.
+        """
+        numbers = array('d')
+        try:
+            for values in self.iter_partials(workers, 'exact'):
+                numbers.extend(values)
+        except FileNotFoundError:
+            print(f"Error: File {self.data} not found.")
+            return None
+        return self.compute_buffer_stats(numbers, percentiles)
+
+    def compute_buffer_stats(self, numbers, percentiles=()) -> tuple:
+        """
+        Compute the statistics of the default mode on a buffer of numbers,
+        such as a mapped binary numbers file or the ranges joined by
+        compute_parallel_stats.
+
+        With NumPy the buffer is wrapped by numpy.frombuffer without copying
+        it and every statistic is vectorized; without it the numbers are
+        copied to a list. Either way the results are identical to the ones
+        of the text file of the same numbers.
+
+        Args:
+            numbers: Buffer of floats, e.g. a memoryview.
+            percentiles: Percentiles wanted, from 0 to 100.
+
+        Returns:
+            tuple: Statistics and percentiles.
+        """
+        if np is not None:
+            numbers = np.frombuffer(numbers, dtype=float)
+        else:
+            numbers = list(numbers)
+        return self.compute_number_stats(numbers, percentiles)
+
+    def compute_mean(self, numbers) -> float:
         """
         Compute the mean of the numbers.
 
         Args:
-            numbers (list): List of numbers.
+            numbers: List, array('d') or NumPy array of numbers.
 
         Returns:
             float: Mean of the numbers.
         """
         if len(numbers) == 0:
             return 0.0
-        return sum(numbers) / len(numbers)
+        return sequential_sum(numbers) / len(numbers)
     
-    def compute_median(self, numbers: list) -> float:
+    def compute_median(self, numbers) -> float:
         """
-        Compute the median of the numbers.
+        Compute the median of the numbers by selection, without sorting or
+        modifying them.
 
         Args:
-            numbers (list): List of numbers.
+            numbers: List, array('d') or NumPy array of numbers.
 
         Returns:
             float: Median of the numbers.
         """
         if len(numbers) == 0:
             return 0.0
-        numbers.sort()
-        n = len(numbers)
-        mid = n // 2
-        if n % 2 == 0:
-            return (numbers[mid - 1] + numbers[mid]) / 2
-        return numbers[mid]
+        return middle_value(select_ranks(numbers, middle_ranks(len(numbers))),
+                            len(numbers))
     
-    def compute_mode(self, numbers: list) -> float | None:
+    def compute_quantiles(self, numbers, percentiles=(50, 90, 99)) -> dict:
+        """
+        Compute percentiles of the numbers by selection, without sorting or
+        modifying the list. Values between two ranks are interpolated
+        linearly, so the 50th percentile is the median.
+
+        Args:
+            numbers: List, array('d') or NumPy array of numbers.
+            percentiles: Percentiles wanted, from 0 to 100.
+
+        Returns:
+            dict: Mapping of percentile to value.
+        """
+        if len(numbers) == 0:
+            return {percentile: 0.0 for percentile in percentiles}
+        positions = quantile_positions(len(numbers), percentiles)
+        selected = select_ranks(
+            numbers,
+            [rank for lower, upper, _ in positions.values() for rank in (lower, upper)]
+        )
+        return interpolate_quantiles(positions, selected)
+
+    def compute_mode(self, numbers) -> float | None:
         """
         Compute the mode of the numbers.
 
         Args:
-            numbers (list): List of numbers.
+            numbers: List, array('d') or NumPy array of numbers.
 
         Returns:
             float: Mode of the numbers.
         """
         if len(numbers) == 0:
             return 0.0
+        if np is not None and isinstance(numbers, np.ndarray):
+            # Ties are resolved by the first occurrence, as with the Counter
+            _, first, counts = np.unique(numbers, return_index=True,
+                                         return_counts=True)
+            ties = first[counts == counts.max()]
+            return float(numbers[ties.max()]) if len(ties) > 1 else None
         freq = Counter(numbers)
         max_freq = max(freq.values())
         mode = [num for num, count in freq.items() if count == max_freq]
@@ -98,12 +669,12 @@ class ComputeStatistics:
             return mode[-1]
         return None
     
-    def compute_variance(self, numbers: list) -> float:
+    def compute_variance(self, numbers) -> float:
         """
         Compute the variance of the numbers.
 
         Args:
-            numbers (list): List of numbers.
+            numbers: List, array('d') or NumPy array of numbers.
 
         Returns:
             float: Variance of the numbers.
@@ -111,7 +682,7 @@ class ComputeStatistics:
         if len(numbers) == 0:
             return 0.0
         mean = self.compute_mean(numbers)
-        variance = sum((x - mean) ** 2 for x in numbers) / len(numbers)
+        variance = sequential_sum(numbers, mean) / len(numbers)
         return variance
     
     def compute_standard_deviation(self, variance: float) -> float:
@@ -144,27 +715,146 @@ class ComputeStatistics:
             f.write(f"Execution time: {execution_time}s.")
 
     
-def main():
+def parse_stats_options(options: dict) -> tuple | None:
+    """
+    Validate the --percentiles, --error, --workers and --storage options.
+
+    Args:
+        options (dict): Options returned by parse_arguments.
+
+    Returns:
+        tuple | None: Percentiles, error of the approximate mode, number of
+        processes and storage of the numbers, or None if one of them is
+        invalid.
+    """
+    try:
+        percentiles = tuple(float(percentile) for percentile
+                            in options.get('percentiles', '').split(',')
+                            if percentile)
+        error = float(options.get('error', 0.01))
+    except ValueError:
+        percentiles, error = (-1,), 0.0
+    if not all(0 <= percentile <= 100 for percentile in percentiles):
+        print("Error: --percentiles must be numbers between 0 and 100.")
+        return None
+    if not 0 < error < 1:
+        print("Error: --error must be a number between 0 and 1.")
+        return None
+    workers = parse_workers(options)
+    storage = parse_storage(options) if workers is not None else None
+    if storage is None:
+        return None
+    return percentiles, error, workers, storage
+
+
+def merge_sketches(sketch_files: list, percentiles: tuple = (),
+                   sketch_file: str | None = None) -> dict | None:
+    """
+    Merge statistics saved with --sketch into the statistics of all their
+    numbers.
+
+    Args:
+        sketch_files (list): Filename paths of the saved statistics.
+        percentiles (tuple): Approximate percentiles wanted, from 0 to 100.
+        sketch_file (str | None): Filename path to save the merged
+            statistics, so they can be merged again.
+
+    Returns:
+        dict | None: Statistics, or None if a saved state cannot be read.
+    """
+    merged = ApproximateStatistics()
+    for filename in sketch_files:
+        try:
+            merged.merge(ApproximateStatistics.load(filename))
+        except FileNotFoundError:
+            print(f"Error: File {filename} not found.")
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Error reading the sketch {filename}: {e}")
+            return None
+    if sketch_file:
+        merged.save(sketch_file)
+    return merged.stats(percentiles)
+
+
+def compute_stats(compute_statistics: ComputeStatistics, options: dict,
+                  percentiles: tuple, error: float, workers: int = 1) -> dict | None:
+    """
+    Compute the statistics of a file in the mode selected by the options.
+
+    Args:
+        compute_statistics (ComputeStatistics): Statistics of the file.
+        options (dict): Options returned by parse_arguments.
+        percentiles (tuple): Percentiles wanted, from 0 to 100.
+        error (float): Error of the approximate mode.
+        workers (int): Number of processes reading the file.
+
+    Returns:
+        dict | None: Statistics, or None if the file is not found.
+    """
+    quantiles = {}
+    if is_binary_numbers(compute_statistics.data):
+        # A mapped binary file has no text to parse in parallel
+        workers = 1
+    if options.get('approximate', False):
+        statistics = compute_statistics.compute_approximate_stats(error, workers)
+        if statistics is None:
+            return None
+        stats = statistics.stats(percentiles)
+        if 'sketch' in options:
+            statistics.save(options['sketch'])
+    elif options.get('single-pass', False):
+        stats = compute_statistics.compute_streaming_stats(workers)
+    else:
+        exact_stats = compute_statistics.compute_exact_stats(percentiles, workers)
+        if exact_stats is None:
+            return None
+        stats, quantiles = exact_stats
+    if stats is None:
+        return None
+    stats['standard_deviation'] = compute_statistics.compute_standard_deviation(
+        stats['variance']
+    )
+    for percentile, value in quantiles.items():
+        stats[f'p{percentile:g}'] = value
+    return stats
+
+
+def main():  # pylint: disable=too-many-locals
     """
     Main function to compute the statistics.
     """
+    arguments = parse_arguments(sys.argv[1:], FLAG_OPTIONS, VALUE_OPTIONS)
+    if arguments is None:
+        return
+    args, options = arguments
+    merging = options.get('merge-sketches', False)
+    if len(args) != 1 and not (merging and args):
+        print("Error: Invalid quantity of arguments. Please check.")
+        return
+    stats_options = parse_stats_options(options)
+    if stats_options is None:
+        return
+    percentiles, error, workers, storage = stats_options
     start_time = time.time()
-    file_ = sys.argv[1]
+    file_ = args[0]
     txt_filename = file_.split('/')[-1].split('.')[0]
-    compute_statistics = ComputeStatistics(file_)
-    numbers = compute_statistics.read_data()
-    stats = {
-        'count': len(numbers),
-        'mean': compute_statistics.compute_mean(numbers),
-        'median': compute_statistics.compute_median(numbers),
-        'mode': compute_statistics.compute_mode(numbers),
-        'variance': compute_statistics.compute_variance(numbers),
-        'standard_deviation': compute_statistics.compute_standard_deviation(
-            compute_statistics.compute_variance(numbers)
-        )
-    }
+    compute_statistics = ComputeStatistics(file_, storage)
+    if merging:
+        txt_filename = MERGED_SKETCHES_NAME
+        stats = merge_sketches(args, percentiles, options.get('sketch'))
+    else:
+        if 'save-binary' in options:
+            if compute_statistics.save_binary(options['save-binary']) is None:
+                return
+            compute_statistics.data = options['save-binary']
+        stats = compute_stats(compute_statistics, options, percentiles,
+                              error, workers)
+    if stats is None:
+        return
     execution_time = time.time() - start_time
 
+    compute_statistics.print_summary()
     for stat, value in stats.items():
         print(f"{stat}: {value}")
     print(f"Excecution time: {execution_time}s.")
@@ -4,6 +4,20 @@ This module converts a list of numbers to binary and hexadecimal.
 import os
 import sys
 import time
+from array import array
+
+from arguments import parse_arguments
+from binary_numbers import (is_binary_numbers, read_binary_numbers,
+                            write_numbers)
+from bulk_conversion import (CONVERT_BATCH_SIZE, convert_batch, drop_seen,
+                             fit_width, format_conversions, format_rows,
+                             parse_width, to_integers)
+from chunked_io import iter_blocks, split_lines
+from number_parsing import (finish_storage, new_storage, parse_floats,
+                            parse_storage)
+
+FLAG_OPTIONS = ("--keep-duplicates",)
+VALUE_OPTIONS = ("--save-binary", "--storage", "--width")
 
 
 # pylint: disable=trailing-whitespace
@@ -11,30 +25,119 @@ class ConvertNumbers:
     """
     Class to compute the statistics of a file containing a list of numbers.
     """
-    def __init__(self, filepath):
+    def __init__(self, filepath, storage: str = "list", width: int | None = None,
+                 keep_duplicates: bool = False):
         self.data = filepath
+        # Container of the numbers returned by read_data, see number_parsing.STORAGES
+        self.storage = storage
+        # Bits of the two's complement of the batch conversions, see bulk_conversion.WIDTHS
+        self.width = width
+        # Whether save_conversions writes a row for every number, repeated or not
+        self.keep_duplicates = keep_duplicates
     
     def read_data(self) -> list:
         """
         Read the numbers from the file and return the list of numbers.
 
+        The numbers are collected in the container of the storage, and a
+        binary numbers file is mapped instead, see read_binary.
+
         Returns:
-            list: List of numbers.
+            list: List of numbers, or array('d') or NumPy array of them.
         """
-        numbers = []
-        try:
-            with open(self.data, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    try:
-                        numbers.append(float(line))
-                    except ValueError:
-                        print(f"Invalid value: '{line}'. Skipping...")
-
-        except FileNotFoundError:
+        if is_binary_numbers(self.data):
+            return self.read_binary()
+        batches = self.iter_batches()
+        if batches is None:
+            return None
+        numbers = new_storage(self.storage)
+        for batch in batches:
+            numbers.extend(batch)
+        return finish_storage(numbers, self.storage)
+
+    def iter_batches(self):
+        """
+        Read the numbers from the file in batches, so the file is converted
+        without holding all of it in memory.
+
+        Text files are read in large blocks of whole lines, and each batch
+        is kept in the container of the storage. Binary numbers files are
+        mapped and sliced into batches of CONVERT_BATCH_SIZE numbers.
+
+        Returns:
+            Generator of the batches of numbers, or None if the file is not
+            found or not valid.
+        """
+        if is_binary_numbers(self.data):
+            numbers = self.read_binary()
+            if numbers is None:
+                return None
+            return (numbers[start:start + CONVERT_BATCH_SIZE]
+                    for start in range(0, len(numbers), CONVERT_BATCH_SIZE))
+        if not os.path.isfile(self.data):
             print(f"Error: File {self.data} not found.")
             return None
-        return numbers
+        return (self.parse_lines(split_lines(block))
+                for block in iter_blocks(self.data))
+
+    def parse_lines(self, lines: list):
+        """
+        Parse the numbers of a batch of lines, skipping the invalid ones.
+
+        The lines are converted in bulk by float() in C, which ignores the
+        surrounding whitespace as strip() does.
+
+        Args:
+            lines (list): Lines of text.
+
+        Returns:
+            list: Numbers of the lines, or array('d') or NumPy array of them.
+        """
+        numbers = parse_floats(lines, self.skip_value)
+        if self.storage == "list":
+            return numbers
+        return finish_storage(array('d', numbers), self.storage)
+
+    def skip_value(self, line: str) -> None:
+        """
+        Report a line that is not a valid number.
+
+        Args:
+            line (str): Line of text.
+        """
+        print(f"Invalid value: '{line.strip()}'. Skipping...")
+
+    def read_binary(self) -> memoryview | None:
+        """
+        Map a binary numbers file in memory, without parsing or copying it.
+
+        Returns:
+            memoryview | None: Read-only buffer of the numbers, or None if
+            the file is not valid.
+        """
+        return read_binary_numbers(self.data, 'convert')
+
+    def save_binary(self, filename: str) -> int | None:
+        """
+        Parse the file once and save its numbers as a binary numbers file,
+        so later runs map it instead of parsing the text.
+
+        Args:
+            filename (str): Filename path of the binary file.
+
+        Returns:
+            int | None: Count of numbers saved, or None if the file is not
+            found.
+        """
+        numbers = self.read_data()
+        if numbers is None:
+            return None
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        count = write_numbers(filename, numbers, 'convert')
+        print(f"Saved {count} numbers to {filename}.")
+        return count
     
     def number_to_binary(self, number: int, bits: int = 10) -> str | None:
         """
@@ -80,6 +183,97 @@ class ConvertNumbers:
         return hex_value
 
     
+    def convert_all(self, numbers, verbose: bool = True) -> dict:
+        """
+        Convert every number to binary and hexadecimal.
+
+        Args:
+            numbers: Iterable of numbers, truncated to integers.
+            verbose (bool): Whether to print every conversion.
+
+        Returns:
+            dict: Mapping of each integer to its 'bin' and 'hex' strings.
+        """
+        converted_numbers = {}
+        for number in numbers:
+            try:
+                number = int(number)
+            except ValueError:
+                print(f"Invalid number: {number}. Skipping...")
+                continue
+            binary = self.number_to_binary(number)
+            hexadecimal = self.number_to_hexadecimal(number)
+            converted_numbers[number] = {
+                'bin': binary,
+                'hex': hexadecimal
+            }
+            if verbose:
+                print(f"Number: {number} -> Binary: {binary} -> Hexadecimal: {hexadecimal}")
+        return converted_numbers
+
+    def convert_batch(self, integers) -> tuple:
+        """
+        Convert a whole batch of integers at once, with the same results as
+        number_to_binary and number_to_hexadecimal, or with the two's
+        complement of the width if there is one.
+
+        Args:
+            integers: Integers, in a list or a NumPy int64 array, fitting in
+                the width if there is one.
+
+        Returns:
+            tuple: Lists of the binary and hexadecimal strings.
+        """
+        return convert_batch(integers, self.width)
+
+    def save_conversions(
+            self,
+            filename: str,
+            batches,
+            start_time: float,
+            verbose: bool = True) -> int | None:
+        """
+        Convert the numbers batch by batch and write every batch of rows to
+        the results file as soon as it is converted, as save_converted_numbers
+        after convert_all but without keeping the conversions in memory.
+
+        Args:
+            filename (str): Filename.
+            batches: Iterable of batches of numbers, e.g. from iter_batches.
+                The numbers are truncated to integers and the ones that do
+                not fit in the width are skipped. Unless keep_duplicates is
+                set, a repeated integer is written once, as in convert_all,
+                keeping a set of the integers written.
+            start_time (float): Time the conversion started, the execution
+                time is measured up to the end of the table.
+            verbose (bool): Whether to print every conversion.
+
+        Returns:
+            int | None: Count of rows written, or None if the file cannot be
+            written.
+        """
+        seen = None if self.keep_duplicates else set()
+        rows = 0
+        try:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, 'w', encoding='utf-8') as f:
+                f.write("ITEM\tNUM\tBIN\tHEX\n")
+                for numbers in batches:
+                    integers = to_integers(numbers)
+                    if self.width is not None:
+                        integers = fit_width(integers, self.width)
+                    if verbose:
+                        sys.stdout.write(format_conversions(integers, self.width))
+                    if seen is not None:
+                        integers = drop_seen(integers, seen)
+                    f.write(format_rows(integers, rows + 1, self.width))
+                    rows += len(integers)
+                f.write(f"\nExecution time: {time.time() - start_time}s.")
+        except OSError as e:
+            print(f"Error saving the converted numbers to {filename}: {e}")
+            return None
+        return rows
+
     def save_converted_numbers(
             self, 
             filename: str, 
@@ -110,31 +304,35 @@ def main():
     """
     Main function to compute the convert the numbers.
     """
+    arguments = parse_arguments(sys.argv[1:], flag_options=FLAG_OPTIONS,
+                                value_options=VALUE_OPTIONS, positional_count=1)
+    if arguments is None:
+        return
+    args, options = arguments
+    storage = parse_storage(options)
+    if storage is None:
+        return
+    width = None
+    if 'width' in options:
+        width = parse_width(options['width'])
+        if width is None:
+            return
     start_time = time.time()
-    file_ = sys.argv[1]
+    file_ = args[0]
     txt_filename = file_.split('/')[-1].split('.')[0]
-    convert_numbers = ConvertNumbers(file_)
-    numbers = convert_numbers.read_data()
-    converted_numbers = {}
-    for number in numbers:
-        try:
-            number = int(number)
-        except ValueError:
-            print(f"Invalid number: {number}. Skipping...")
-            continue
-        binary = convert_numbers.number_to_binary(number)
-        hexadecimal = convert_numbers.number_to_hexadecimal(number)
-        converted_numbers[number] = {
-            'bin': binary,
-            'hex': hexadecimal
-        }
-        print(f"Number: {number} -> Binary: {binary} -> Hexadecimal: {hexadecimal}")
-    
-    execution_time = time.time() - start_time
-    convert_numbers.save_converted_numbers(
-        f"results/P2/{txt_filename}/ConvertionResults.txt", 
-        converted_numbers, 
-        execution_time
+    convert_numbers = ConvertNumbers(file_, storage, width,
+                                     'keep-duplicates' in options)
+    if 'save-binary' in options:
+        if convert_numbers.save_binary(options['save-binary']) is None:
+            return
+        convert_numbers.data = options['save-binary']
+    batches = convert_numbers.iter_batches()
+    if batches is None:
+        return
+    convert_numbers.save_conversions(
+        f"results/P2/{txt_filename}/ConvertionResults.txt",
+        batches,
+        start_time
     )
 
 if __name__ == "__main__":
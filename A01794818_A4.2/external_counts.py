@@ -0,0 +1,126 @@
+"""
+This module counts words in bounded memory: when the table of counts grows
+past a size, it is spilled to a temporary file sorted by word (a run), and
+the runs are merged at the end, like an external sort.
+"""
+import heapq
+import os
+import tempfile
+from collections import Counter
+from itertools import groupby
+from operator import itemgetter
+
+# Runs merged at once, so the open files stay few
+MERGE_FAN_IN = 64
+
+
+def write_run(pairs, directory: str) -> str:
+    """
+    Write word counts sorted by word to a new file.
+
+    Words never contain whitespace, so a tab separates them from their
+    counts.
+
+    Args:
+        pairs: Iterable of (word, count) pairs sorted by word.
+        directory (str): Directory of the file.
+
+    Returns:
+        str: Path of the file.
+    """
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='\n',
+                                     dir=directory, suffix='.txt',
+                                     delete=False) as f:
+        f.writelines(f"{word}\t{count}\n" for word, count in pairs)
+        return f.name
+
+
+def read_run(filename: str):
+    """
+    Read the word counts of a run.
+
+    Args:
+        filename (str): Path of the run.
+
+    Yields:
+        tuple: (word, count) pairs sorted by word.
+    """
+    with open(filename, 'r', encoding='utf-8', newline='\n') as f:
+        for line in f:
+            word, _, count = line.rpartition('\t')
+            yield word, int(count)
+
+
+def merge_runs(filenames: list):
+    """
+    Merge runs with a k-way merge, adding the counts of the same word.
+
+    Args:
+        filenames (list): Paths of the runs.
+
+    Yields:
+        tuple: (word, count) pairs sorted by word.
+    """
+    runs = heapq.merge(*(read_run(filename) for filename in filenames),
+                       key=itemgetter(0))
+    for word, pairs in groupby(runs, key=itemgetter(0)):
+        yield word, sum(count for _, count in pairs)
+
+
+def count_external(word_batches, max_words: int):
+    """
+    Count words keeping at most about max_words distinct words in memory.
+
+    The table is checked after every batch, so it can pass max_words by the
+    new words of a batch. When there are MERGE_FAN_IN runs they are merged
+    into one, so any number of spills is merged with MERGE_FAN_IN files
+    open at most.
+
+    Args:
+        word_batches: Iterable of lists of words.
+        max_words (int): Distinct words that trigger a spill.
+
+    Returns:
+        Generator of (word, count) pairs sorted by word. The runs are
+        removed when the pairs are exhausted or the generator is closed.
+    """
+    # Removed by _merge_and_remove, after the counting returns
+    # pylint: disable-next=consider-using-with
+    directory = tempfile.TemporaryDirectory(prefix='word_count_')
+    try:
+        runs = []
+        word_count = Counter()
+        for words in word_batches:
+            word_count.update(words)
+            if len(word_count) > max_words:
+                runs.append(write_run(sorted(word_count.items()),
+                                      directory.name))
+                word_count = Counter()
+            if len(runs) >= MERGE_FAN_IN:
+                merged = write_run(merge_runs(runs), directory.name)
+                for filename in runs:
+                    os.remove(filename)
+                runs = [merged]
+        if word_count:
+            runs.append(write_run(sorted(word_count.items()), directory.name))
+    except BaseException:
+        directory.cleanup()
+        raise
+    return _merge_and_remove(runs, directory)
+
+
+def _merge_and_remove(runs: list, directory):
+    """
+    Merge the runs and remove their directory at the end.
+
+    Args:
+        runs (list): Paths of the runs.
+        directory (TemporaryDirectory): Directory of the runs.
+
+    Yields:
+        tuple: (word, count) pairs sorted by word.
+    """
+    try:
+        yield from merge_runs(runs)
+    finally:
+        directory.cleanup()
@@ -0,0 +1,169 @@
+"""
+This module parses the numbers of text files in large blocks, applying
+cleanup rules to the lines that are not valid numbers, and stores them in
+a list or a compact typed array.
+"""
+from array import array
+from typing import Counter
+
+from chunked_io import iter_blocks, split_lines
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only needed by the numpy storage
+    np = None
+
+# Containers the parsed numbers can be stored in: a list of float objects
+# (about 32 bytes per number), or 8 bytes per number in an array('d') or a
+# NumPy array
+STORAGES = ("list", "array", "numpy")
+
+
+def clean_number(line: str, summary: Counter) -> float | None:
+    """
+    Apply the cleanup rules to a line that is not a valid number.
+
+    Args:
+        line (str): Line of text.
+        summary (Counter): Counts of invalid, extracted and skipped values,
+            updated in place.
+
+    Returns:
+        float | None: Number of the line, or None if it has no digits.
+    """
+    line = line.strip()
+    line = line.replace(',', '.')  # Replace comma with dot
+    line = line.replace(';', '.')  # Replace semicolon with dot
+    try:
+        return float(line)
+    except ValueError:
+        summary['invalid'] += 1
+        # Remove non-numeric characters
+        cleaned_number = ''.join(filter(str.isdigit, line))
+        # Check if the line contains a number
+        if cleaned_number != '':
+            summary['extracted'] += 1
+            return float(cleaned_number)
+        summary['skipped'] += 1
+        return None
+
+
+def parse_lines(lines: list, summary: Counter) -> list:
+    """
+    Parse the numbers of a batch of lines.
+
+    The clean lines are converted in bulk by float() in C, and only the
+    lines that float() rejects go to the cleanup rules. float() ignores the
+    surrounding whitespace and never accepts a comma or a semicolon, so the
+    numbers are the same as when every line is cleaned first.
+
+    Args:
+        lines (list): Lines of text.
+        summary (Counter): Counts of invalid, extracted and skipped values,
+            updated in place.
+
+    Returns:
+        list: Numbers of the lines, in order.
+    """
+    return parse_floats(lines, lambda line: clean_number(line, summary))
+
+
+def parse_floats(lines: list, reject) -> list:
+    """
+    Convert a batch of lines with float() in bulk, passing the lines that
+    float() rejects to a function.
+
+    Args:
+        lines (list): Lines of text.
+        reject: Function called with each rejected line, returning its
+            number or None to skip it.
+
+    Returns:
+        list: Numbers of the lines, in order.
+    """
+    numbers = []
+    remaining = iter(lines)
+    position = 0
+    while True:
+        start = len(numbers)
+        try:
+            numbers.extend(map(float, remaining))
+            return numbers
+        except ValueError:
+            # The numbers parsed before the error stay in the list and the
+            # iterator resumes after the rejected line
+            position += len(numbers) - start
+        number = reject(lines[position])
+        position += 1
+        if number is not None:
+            numbers.append(number)
+
+
+def read_numbers(filename: str, summary: Counter, start: int = 0,
+                 end: int | None = None):
+    """
+    Read the numbers of a byte range of a file in large blocks.
+
+    Args:
+        filename (str): Path of the file.
+        summary (Counter): Counts of invalid, extracted and skipped values,
+            updated in place.
+        start (int): First byte of the range, at a line start.
+        end (int | None): Byte after the range, the file end if None.
+
+    Yields:
+        list: Numbers of each block, in file order.
+    """
+    for block in iter_blocks(filename, start, end):
+        yield parse_lines(split_lines(block), summary)
+
+
+def new_storage(storage: str):
+    """
+    Create an empty container to collect numbers.
+
+    Args:
+        storage (str): Storage from STORAGES.
+
+    Returns:
+        list | array: Empty container, extended with the numbers and then
+        passed to finish_storage.
+    """
+    return [] if storage == "list" else array('d')
+
+
+def finish_storage(numbers, storage: str):
+    """
+    Turn the collected numbers into the container of the storage.
+
+    Args:
+        numbers (list | array): Numbers collected in a new_storage container.
+        storage (str): Storage from STORAGES.
+
+    Returns:
+        list | array | numpy.ndarray: The numbers. The NumPy array is a view
+        of the array('d'), so no copy is made.
+    """
+    if storage == "numpy":
+        return np.frombuffer(numbers)
+    return numbers
+
+
+def parse_storage(options: dict) -> str | None:
+    """
+    Validate the --storage option.
+
+    Args:
+        options (dict): Options returned by parse_arguments.
+
+    Returns:
+        str | None: Storage of the numbers, or None if it is invalid.
+    """
+    storage = options.get("storage", "list")
+    if storage not in STORAGES:
+        print(f"Error: --storage must be one of {', '.join(STORAGES)}.")
+        return None
+    if storage == "numpy" and np is None:
+        print("Error: --storage numpy requires NumPy.")
+        return None
+    return storage
@@ -0,0 +1,204 @@
+"""
+This module finds order statistics (median, percentiles and mode) of
+numbers without sorting them, by selection.
+"""
+import math
+import random
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, selection falls back to pure Python
+    np = None
+
+# Below this size the candidates of a selection are simply sorted
+SELECT_SORT_SIZE = 64
+
+
+def _select_ranks(candidates, ranks: list, offset: int,
+                  selected: dict) -> None:
+    """
+    Find the values of several ranks of the sorted numbers by quickselect.
+
+    The input is never reordered: every partition step only keeps the
+    numbers on the side of the pivot that still holds wanted ranks, so the
+    candidates shrink geometrically and no full sort is done.
+
+    Args:
+        candidates: Sequence of numbers holding the wanted ranks.
+        ranks (list): Sorted ranks wanted, relative to the whole data.
+        offset (int): Rank of the smallest candidate in the whole data.
+        selected (dict): Mapping of rank to value, updated in place.
+    """
+    while ranks:
+        if len(candidates) <= SELECT_SORT_SIZE:
+            ordered = sorted(candidates)
+            for rank in ranks:
+                selected[rank] = ordered[rank - offset]
+            return
+        pivot = sorted(candidates[index] for index
+                       in random.sample(range(len(candidates)), 3))[1]
+        below = [x for x in candidates if x < pivot]
+        below_end = offset + len(below)
+        low_ranks = [rank for rank in ranks if rank < below_end]
+        if low_ranks:
+            _select_ranks(below, low_ranks, offset, selected)
+        del below
+        equal_end = below_end + candidates.count(pivot)
+        for rank in ranks:
+            if below_end <= rank < equal_end:
+                selected[rank] = pivot
+        ranks = [rank for rank in ranks if rank >= equal_end]
+        if ranks:
+            candidates = [x for x in candidates if x > pivot]
+            offset = equal_end
+
+
+def select_ranks(numbers, ranks) -> dict:
+    """
+    Find the values that several ranks would hold in the sorted numbers.
+
+    Uses numpy.partition when NumPy is available, and a pure Python
+    quickselect otherwise. The input is not modified in either case.
+
+    Args:
+        numbers: Sequence of numbers.
+        ranks: Ranks wanted, from 0 to len(numbers) - 1.
+
+    Returns:
+        dict: Mapping of rank to value.
+    """
+    ranks = sorted(set(ranks))
+    if not ranks:
+        return {}
+    if np is not None:
+        partitioned = np.partition(np.asarray(numbers, dtype=float), ranks)
+        return {rank: partitioned[rank].item() for rank in ranks}
+    selected = {}
+    _select_ranks(numbers, ranks, 0, selected)
+    return selected
+
+
+def middle_ranks(count: int) -> tuple:
+    """
+    Ranks of the middle numbers of count sorted numbers, the same rank
+    twice when count is odd.
+
+    Args:
+        count (int): Number of numbers, greater than 0.
+
+    Returns:
+        tuple: Lower and upper middle ranks.
+    """
+    return (count - 1) // 2, count // 2
+
+
+def middle_value(selected: dict, count: int) -> float:
+    """
+    Median of count numbers from the values of their middle ranks.
+
+    Args:
+        selected (dict): Mapping of rank to value, with the middle ranks.
+        count (int): Number of numbers, greater than 0.
+
+    Returns:
+        float: Median of the numbers.
+    """
+    lower, upper = middle_ranks(count)
+    if lower == upper:
+        return float(selected[upper])
+    return float(selected[lower] + selected[upper]) / 2
+
+
+def frequency_mode(frequencies: dict) -> float | None:
+    """
+    Mode of the numbers counted by a frequency table, as compute_mode finds
+    it over the sorted numbers: the largest of the most frequent values.
+
+    Args:
+        frequencies (dict): Mapping of number to its count, not empty.
+
+    Returns:
+        float | None: The mode, or None if a single value is the most
+        frequent.
+    """
+    max_freq = max(frequencies.values())
+    modes = [x for x, freq in frequencies.items() if freq == max_freq]
+    return max(modes) if len(modes) > 1 else None
+
+
+def largest_mode(numbers) -> float | None:
+    """
+    Mode of the numbers as frequency_mode finds it, without sorting them in
+    place. With NumPy the values are counted by numpy.unique.
+
+    Args:
+        numbers: Sequence of numbers, not empty.
+
+    Returns:
+        float | None: The mode, or None if a single value is the most
+        frequent.
+    """
+    if np is None:
+        return frequency_mode(Counter(numbers))
+    values, counts = np.unique(np.asarray(numbers, dtype=float),
+                               return_counts=True)
+    modes = values[counts == counts.max()]
+    return modes[-1].item() if len(modes) > 1 else None
+
+
+def quantile_positions(count: int, percentiles) -> dict:
+    """
+    Ranks around each percentile of count sorted numbers.
+
+    Args:
+        count (int): Number of numbers.
+        percentiles: Percentiles wanted, from 0 to 100.
+
+    Returns:
+        dict: Mapping of percentile to its lower rank, upper rank and the
+        interpolation fraction between them.
+    """
+    positions = {}
+    for percentile in percentiles:
+        position = (count - 1) * percentile / 100
+        lower = math.floor(position)
+        positions[percentile] = (lower, min(lower + 1, count - 1),
+                                 position - lower)
+    return positions
+
+
+def order_ranks(count: int, positions: dict) -> list:
+    """
+    Ranks needed for the median and the percentiles of count numbers.
+
+    Args:
+        count (int): Number of numbers, greater than 0.
+        positions (dict): Positions returned by quantile_positions.
+
+    Returns:
+        list: Middle ranks followed by the ranks around every percentile.
+    """
+    return [*middle_ranks(count),
+            *(rank for lower, upper, _ in positions.values()
+              for rank in (lower, upper))]
+
+
+def interpolate_quantiles(positions: dict, selected: dict) -> dict:
+    """
+    Interpolate linearly the percentiles between the values of their ranks.
+
+    Args:
+        positions (dict): Positions returned by quantile_positions.
+        selected (dict): Mapping of rank to value.
+
+    Returns:
+        dict: Mapping of percentile to value.
+    """
+    quantiles = {}
+    for percentile, (lower, upper, fraction) in positions.items():
+        quantiles[percentile] = selected[lower]
+        if fraction:
+            quantiles[percentile] = (selected[lower] * (1 - fraction)
+                                     + selected[upper] * fraction)
+    return quantiles
@@ -0,0 +1,427 @@
+"""
+This module implements fixed-memory sketches to approximate the quantiles
+and the most frequent values of streams of numbers too big to hold in
+memory, and the counts of streams of words. The sketches can be serialized
+and merged, so the sketches of several files or shards combine into the
+sketch of all of them.
+"""
+import hashlib
+import math
+import random
+import struct
+from array import array
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, CountMinSketch.update uses Python
+    np = None
+
+# Rank error of a KLL sketch is about KLL_ERROR_FACTOR / k
+KLL_ERROR_FACTOR = 1.7
+KLL_CAPACITY_RATIO = 2 / 3
+# Two 32-bit hashes of a key, from its 64-bit digest
+_DIGEST = struct.Struct("<II")
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty).
+
+    Numbers are kept in a hierarchy of compactors. When a compactor is
+    full it is sorted and every other number is promoted to the next
+    level, where each number stands for twice as many inputs. Memory stays
+    about 3k numbers and the rank error about error * count.
+    """
+    def __init__(self, error: float = 0.01, seed: int | None = None):
+        self.k = max(8, math.ceil(KLL_ERROR_FACTOR / error))
+        self.count = 0
+        self.size = 0
+        self.max_size = 0
+        self.compactors = []
+        self._random = random.Random(seed)
+        self._grow()
+
+    def _capacity(self, level: int) -> int:
+        """
+        Capacity of a compactor, smaller for the lower levels.
+
+        Args:
+            level (int): Level of the compactor.
+
+        Returns:
+            int: Number of items that triggers its compaction.
+        """
+        depth = len(self.compactors) - level - 1
+        return math.ceil(self.k * KLL_CAPACITY_RATIO ** depth) + 1
+
+    def _grow(self) -> None:
+        """
+        Add a compactor on top of the hierarchy.
+        """
+        self.compactors.append([])
+        self.max_size = sum(self._capacity(level)
+                            for level in range(len(self.compactors)))
+
+    def _compress(self) -> None:
+        """
+        Compact full compactors until the sketch is below its maximum size.
+        """
+        for level, compactor in enumerate(self.compactors):
+            if len(compactor) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                compactor.sort()
+                keep = [compactor.pop()] if len(compactor) % 2 else []
+                offset = self._random.randint(0, 1)
+                self.compactors[level + 1].extend(compactor[offset::2])
+                self.compactors[level] = keep
+                self.size = sum(len(items) for items in self.compactors)
+                if self.size < self.max_size:
+                    break
+
+    def update(self, numbers) -> None:
+        """
+        Add every number of an iterable to the sketch.
+
+        Args:
+            numbers: Iterable of numbers.
+        """
+        numbers = iter(numbers)
+        while True:
+            # Fill the free room of the sketch in one go, then compact
+            batch = list(islice(numbers, self.max_size - self.size))
+            if not batch:
+                return
+            self.compactors[0].extend(batch)
+            self.size += len(batch)
+            self.count += len(batch)
+            if self.size >= self.max_size:
+                self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """
+        Add the numbers summarized by another sketch to this one.
+
+        Args:
+            other (KLLSketch): Sketch to merge.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self.size = sum(len(items) for items in self.compactors)
+        while self.size >= self.max_size:
+            self._compress()
+
+    def quantile(self, fraction: float) -> float | None:
+        """
+        Approximate quantile of the numbers added so far.
+
+        Args:
+            fraction (float): Quantile wanted, from 0 to 1.
+
+        Returns:
+            float | None: Approximate quantile, or None if the sketch is empty.
+        """
+        items = sorted((x, 1 << level)
+                       for level, compactor in enumerate(self.compactors)
+                       for x in compactor)
+        if not items:
+            return None
+        target = fraction * sum(weight for _, weight in items)
+        cumulative = 0
+        for x, weight in items:
+            cumulative += weight
+            if cumulative >= target:
+                return x
+        return items[-1][0]
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the sketch.
+
+        Returns:
+            dict: JSON serializable state of the sketch.
+        """
+        return {"type": "kll", "k": self.k, "count": self.count,
+                "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "KLLSketch":
+        """
+        Rebuild a sketch serialized with to_dict.
+
+        Args:
+            state (dict): State of the sketch.
+
+        Returns:
+            KLLSketch: The sketch.
+        """
+        sketch = cls(KLL_ERROR_FACTOR / state["k"])
+        sketch.k = state["k"]
+        sketch.compactors = []
+        for _ in state["compactors"]:
+            sketch._grow()
+        sketch.compactors = [list(items) for items in state["compactors"]]
+        sketch.count = state["count"]
+        sketch.size = sum(len(items) for items in sketch.compactors)
+        return sketch
+
+
+class MisraGries:
+    """
+    Misra-Gries heavy hitters sketch.
+
+    Keeps at most capacity counters. When a new value does not fit, every
+    counter is decremented instead, so each count is underestimated by at
+    most count / (capacity + 1), i.e. error * count.
+    """
+    def __init__(self, error: float = 0.01):
+        self.capacity = max(1, math.ceil(1 / error))
+        self.count = 0
+        self.counters = {}
+
+    def update(self, numbers) -> None:
+        """
+        Add every number of an iterable to the sketch.
+
+        Args:
+            numbers: Iterable of numbers.
+        """
+        counters = self.counters
+        capacity = self.capacity
+        count = 0
+        for x in numbers:
+            count += 1
+            if x in counters:
+                counters[x] += 1
+            elif len(counters) < capacity:
+                counters[x] = 1
+            else:
+                counters = {key: value - 1 for key, value in counters.items()
+                            if value > 1}
+        self.counters = counters
+        self.count += count
+
+    def merge(self, other: "MisraGries") -> None:
+        """
+        Add the numbers summarized by another sketch to this one.
+
+        Args:
+            other (MisraGries): Sketch to merge.
+        """
+        counters = dict(self.counters)
+        for key, value in other.counters.items():
+            counters[key] = counters.get(key, 0) + value
+        if len(counters) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter
+            cut = sorted(counters.values(), reverse=True)[self.capacity]
+            counters = {key: value - cut for key, value in counters.items()
+                        if value > cut}
+        self.counters = counters
+        self.count += other.count
+
+    def most_common(self, n: int | None = None) -> list:
+        """
+        Values with the largest estimated counts.
+
+        Args:
+            n (int | None): Number of values, all of them if None.
+
+        Returns:
+            list: Tuples (value, estimated count), most frequent first.
+        """
+        ordered = sorted(self.counters.items(), key=lambda item: item[1],
+                         reverse=True)
+        return ordered if n is None else ordered[:n]
+
+    def mode(self) -> float | None:
+        """
+        Approximate most frequent value.
+
+        Returns:
+            float | None: Value with the largest estimated count, or None if
+            the sketch is empty.
+        """
+        most_common = self.most_common(1)
+        return most_common[0][0] if most_common else None
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the sketch.
+
+        Returns:
+            dict: JSON serializable state of the sketch.
+        """
+        return {"type": "misra_gries", "capacity": self.capacity,
+                "count": self.count,
+                "counters": [[key, value]
+                             for key, value in self.counters.items()]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "MisraGries":
+        """
+        Rebuild a sketch serialized with to_dict.
+
+        Args:
+            state (dict): State of the sketch.
+
+        Returns:
+            MisraGries: The sketch.
+        """
+        sketch = cls()
+        sketch.capacity = state["capacity"]
+        sketch.count = state["count"]
+        sketch.counters = dict(state["counters"])
+        return sketch
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch (Cormode and Muthukrishnan).
+
+    Every key adds its count to one counter in each of depth rows of width
+    counters, chosen by hashing the key. The estimate of a key is the
+    smallest of its counters, which never underestimates its count and,
+    with probability confidence, overestimates it by at most
+    error * count.
+    """
+    def __init__(self, error: float = 0.0001, confidence: float = 0.99):
+        self.width = max(1, math.ceil(math.e / error))
+        self.depth = max(1, math.ceil(math.log(1 / (1 - confidence))))
+        self.count = 0
+        self.table = [array('q', bytes(8 * self.width))
+                      for _ in range(self.depth)]
+
+    def _columns(self, key: str) -> list:
+        """
+        Counters of a key in every row, by double hashing a 64-bit digest
+        of the key, so the sketches of different processes agree.
+
+        Args:
+            key (str): Key.
+
+        Returns:
+            list: Column of the key in each row.
+        """
+        first, step = _DIGEST.unpack(
+            hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest())
+        step |= 1
+        return [(first + row * step) % self.width for row in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """
+        Add the count of a key to the sketch.
+
+        Args:
+            key (str): Key.
+            count (int): Count to add.
+
+        Returns:
+            int: Estimated count of the key after adding it.
+        """
+        estimate = None
+        for counters, column in zip(self.table, self._columns(key)):
+            counters[column] += count
+            if estimate is None or counters[column] < estimate:
+                estimate = counters[column]
+        self.count += count
+        return estimate
+
+    def update(self, counts: dict) -> list:
+        """
+        Add the counts of many keys at once. With NumPy the counters of
+        every row are updated and read in bulk, so only the hashing runs
+        per key.
+
+        Args:
+            counts (dict): Count to add for every key.
+
+        Returns:
+            list: Estimated count of every key after adding all of them, in
+            the order of counts.
+        """
+        self.count += sum(counts.values())
+        if np is None:
+            columns = [self._columns(key) for key in counts]
+            for key_columns, count in zip(columns, counts.values()):
+                for counters, column in zip(self.table, key_columns):
+                    counters[column] += count
+            return [min(counters[column]
+                        for counters, column in zip(self.table, key_columns))
+                    for key_columns in columns]
+        digests = b"".join(hashlib.blake2b(key.encode('utf-8'),
+                                           digest_size=8).digest()
+                           for key in counts)
+        hashes = np.frombuffer(digests, dtype='<u4').astype(
+            np.uint64).reshape(-1, 2)
+        steps = hashes[:, 1] | np.uint64(1)
+        values = np.fromiter(counts.values(), dtype=np.int64,
+                             count=len(counts))
+        estimates = None
+        for row, counters in enumerate(self.table):
+            columns = ((hashes[:, 0] + np.uint64(row) * steps)
+                       % np.uint64(self.width)).astype(np.intp)
+            table = np.frombuffer(counters, dtype=np.int64)
+            np.add.at(table, columns, values)
+            estimates = table[columns] if estimates is None \
+                else np.minimum(estimates, table[columns])
+        return [] if estimates is None else estimates.tolist()
+
+    def estimate(self, key: str) -> int:
+        """
+        Estimated count of a key.
+
+        Args:
+            key (str): Key.
+
+        Returns:
+            int: Smallest counter of the key, at least its count.
+        """
+        return min(counters[column]
+                   for counters, column in zip(self.table, self._columns(key)))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        """
+        Add the counts summarized by another sketch of the same size.
+
+        Args:
+            other (CountMinSketch): Sketch to merge.
+        """
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("Count-Min sketches of different sizes.")
+        for counters, other_counters in zip(self.table, other.table):
+            for column, value in enumerate(other_counters):
+                counters[column] += value
+        self.count += other.count
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the sketch.
+
+        Returns:
+            dict: JSON serializable state of the sketch.
+        """
+        return {"type": "count_min", "width": self.width, "depth": self.depth,
+                "count": self.count,
+                "table": [counters.tolist() for counters in self.table]}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "CountMinSketch":
+        """
+        Rebuild a sketch serialized with to_dict.
+
+        Args:
+            state (dict): State of the sketch.
+
+        Returns:
+            CountMinSketch: The sketch.
+        """
+        sketch = cls()
+        sketch.width = state["width"]
+        sketch.depth = state["depth"]
+        sketch.count = state["count"]
+        sketch.table = [array('q', counters) for counters in state["table"]]
+        return sketch
@@ -0,0 +1,97 @@
+"""
+This module splits blocks of text into the tokens counted by word_count.py:
+words, optionally without punctuation and case folded, or n-grams of them.
+
+Every block is normalized and split at once, by str.split() or by a single
+findall of a precompiled regular expression, so no Python code runs per
+word. ASCII text, the usual case, takes a faster path: its punctuation is
+translated to spaces and the text is split.
+"""
+import re
+
+# Runs of letters, digits and underscores, keeping the apostrophes and
+# hyphens inside a word, e.g. "don't" or "well-known"
+WORD_PATTERN = re.compile(r"\w+(?:['’-]\w+)*")
+# ASCII characters that are not letters, digits, underscores, apostrophes or
+# hyphens, translated to spaces
+PUNCTUATION_TABLE = str.maketrans({
+    chr(code): ' ' for code in range(128)
+    if not (chr(code).isalnum() or chr(code) in "_'-")})
+# Apostrophes and hyphens that are not between two word characters
+LOOSE_JOINERS = re.compile(r"['-](?:(?!\w)|(?<=(?<!\w)['-]))")
+
+
+def strip_ascii_punctuation(text: str) -> list:
+    """
+    Split an ASCII text into the same words as WORD_PATTERN.findall(),
+    translating the punctuation to spaces.
+
+    Args:
+        text (str): ASCII text.
+
+    Returns:
+        list: Words of the text.
+    """
+    text = text.translate(PUNCTUATION_TABLE)
+    if "'" in text or '-' in text:
+        text = LOOSE_JOINERS.sub(' ', text)
+    return text.split()
+
+
+class Tokenizer:
+    """
+    Tokenizer of the words of a text.
+
+    By default the words are the whitespace separated strings of the text
+    in lowercase, as word_count.py always counted them.
+    """
+    def __init__(self, strip_punctuation: bool = False, casefold: bool = False,
+                 ngrams: int = 1):
+        # Whether to keep only the letters, digits and inner apostrophes
+        # and hyphens of the words, so "word," and "word" are the same
+        self.strip_punctuation = strip_punctuation
+        # Whether to use Unicode case folding instead of lowercase, so e.g.
+        # "Straße" and "STRASSE" are the same
+        self.casefold = casefold
+        # Number of consecutive words of a line counted together
+        self.ngrams = ngrams
+
+    def words(self, text: str) -> list:
+        """
+        Normalize a text and split it into words.
+
+        Args:
+            text (str): Text.
+
+        Returns:
+            list: Words of the text.
+        """
+        text = text.casefold() if self.casefold else text.lower()
+        if self.strip_punctuation:
+            if text.isascii():
+                return strip_ascii_punctuation(text)
+            return WORD_PATTERN.findall(text)
+        return text.split()
+
+    def tokenize(self, block: bytes) -> list:
+        """
+        Split a block of UTF-8 text into tokens.
+
+        N-grams are made of consecutive words of the same line, so they do
+        not depend on how the file is split into blocks.
+
+        Args:
+            block (bytes): Block of whole lines.
+
+        Returns:
+            list: Words, or n-grams of words joined by a space, in order.
+        """
+        text = block.decode('utf-8')
+        if self.ngrams == 1:
+            return self.words(text)
+        tokens = []
+        for line in text.splitlines():
+            words = self.words(line)
+            grams = zip(*(words[i:] for i in range(self.ngrams)))
+            tokens.extend(map(" ".join, grams))
+        return tokens
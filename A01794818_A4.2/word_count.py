@@ -1,78 +1,342 @@
 """
 This module count the number of words in a text file.
 """
+import heapq
 import os
 import sys
 import time
+from collections import Counter
+from multiprocessing import Pool
+from itertools import islice
+from operator import itemgetter
+
+from arguments import parse_arguments, parse_workers
+from chunked_io import iter_blocks, split_file
+from external_counts import count_external
+from sketches import CountMinSketch
+from tokenizer import Tokenizer
+
+FLAG_OPTIONS = ("--sorted", "--quiet", "--approximate", "--strip-punctuation",
+                "--casefold")
+VALUE_OPTIONS = ("--workers", "--top", "--max-words", "--error", "--ngrams")
+# Error of the Count-Min sketch of --approximate, as a fraction of the words
+WORD_SKETCH_ERROR = 0.0001
+# Words reported by --approximate without --top
+APPROXIMATE_TOP = 100
+# Lines saved at once, see CountWords.save_results
+SAVE_LINES = 1 << 16
+
+
+def count_words(task: tuple) -> Counter:
+    """
+    Count the words of a byte range of a file, in large blocks of lines.
+
+    Splitting a whole block and lowering it at once gives the same words
+    as splitting and lowering every line.
+
+    Args:
+        task (tuple): Path of the file, first and last byte of the range,
+            the last one None for the file end, and Tokenizer of the words.
+
+    Returns:
+        Counter: Count of every word, in order of first appearance.
+    """
+    filename, start, end, tokenizer = task
+    word_count = Counter()
+    for block in iter_blocks(filename, start, end):
+        word_count.update(tokenizer.tokenize(block))
+    return word_count
+
+
+def _merge_pair(pair: tuple) -> Counter:
+    """
+    Merge the word counts of two consecutive ranges.
+
+    Args:
+        pair (tuple): Word counts of a range and of the next one.
+
+    Returns:
+        Counter: Count of every word of both ranges, in order of first
+        appearance.
+    """
+    first, second = pair
+    first.update(second)
+    return first
+
+
+def merge_counts(word_counts: list, pool=None) -> Counter:
+    """
+    Merge the word counts of consecutive ranges by a tree reduction: the
+    counts are merged in pairs, level by level, until one is left.
+
+    Args:
+        word_counts (list): Word counts of the ranges, in file order.
+        pool (Pool | None): Pool of processes that merges the pairs of a
+            level at the same time, or None to merge them here.
+
+    Returns:
+        Counter: Count of every word, in order of first appearance.
+    """
+    if not word_counts:
+        return Counter()
+    while len(word_counts) > 1:
+        pairs = list(zip(word_counts[::2], word_counts[1::2]))
+        merged = pool.map(_merge_pair, pairs) if pool is not None and len(pairs) > 1 \
+            else [_merge_pair(pair) for pair in pairs]
+        if len(word_counts) % 2:
+            merged.append(word_counts[-1])
+        word_counts = merged
+    return word_counts[0]
+
+
+def rank_words(word_count: dict, top: int | None = None,
+               by_frequency: bool = False):
+    """
+    Select the words to report and their order.
+
+    The top words are selected with a heap of size top, without sorting the
+    whole vocabulary. Words with the same count keep their order of first
+    appearance.
+
+    Args:
+        word_count (dict): Count of every word, or iterable of (word, count)
+            pairs.
+        top (int | None): Number of most frequent words to report, every
+            word if None.
+        by_frequency (bool): Whether to sort the words by decreasing count
+            instead of keeping their order of first appearance.
+
+    Returns:
+        Iterable of the reported (word, count) pairs. The top words are
+        always sorted by decreasing count.
+    """
+    items = word_count.items() if isinstance(word_count, dict) else word_count
+    if top is not None:
+        return heapq.nlargest(top, items, key=itemgetter(1))
+    if by_frequency:
+        return sorted(items, key=itemgetter(1), reverse=True)
+    return items
+
+
+def parse_count_options(options: dict) -> tuple | None:
+    """
+    Validate the --workers, --top, --max-words, --error and tokenizer
+    options and their combinations.
+
+    Args:
+        options (dict): Options returned by parse_arguments.
+
+    Returns:
+        tuple | None: Number of processes, number of words to report (None
+        for every word), distinct words kept in memory (None for no limit)
+        error of the approximate mode and Tokenizer of the words, or None if
+        one of them is invalid.
+    """
+    workers = parse_workers(options)
+    if workers is None:
+        return None
+    try:
+        top = int(options['top']) if 'top' in options else None
+    except ValueError:
+        top = 0
+    try:
+        max_words = int(options['max-words']) if 'max-words' in options else None
+    except ValueError:
+        max_words = 0
+    try:
+        error = float(options.get('error', WORD_SKETCH_ERROR))
+    except ValueError:
+        error = 0.0
+    try:
+        ngrams = int(options.get('ngrams', 1))
+    except ValueError:
+        ngrams = 0
+    modes = workers > 1, max_words is not None, 'approximate' in options
+    checks = [
+        (top is not None and top < 1, "--top must be a positive integer."),
+        (max_words is not None and max_words < 1,
+         "--max-words must be a positive integer."),
+        (not 0 < error < 1, "--error must be a number between 0 and 1."),
+        (ngrams < 1, "--ngrams must be a positive integer."),
+        (sum(modes) > 1, "--workers, --max-words and --approximate cannot "
+         "be combined."),
+        (modes[1] and 'sorted' in options,
+         "--sorted cannot be combined with --max-words, use --top."),
+    ]
+    for failed, message in checks:
+        if failed:
+            print(f"Error: {message}")
+            return None
+    tokenizer = Tokenizer('strip-punctuation' in options, 'casefold' in options,
+                          ngrams)
+    return workers, top, max_words, error, tokenizer
+
 
 # pylint: disable=trailing-whitespace
 class CountWords:
     """
     Class to count frequency of words of a file containing a list of words.
     """
-    def __init__(self, filepath):
+    def __init__(self, filepath, top: int | None = None, by_frequency: bool = False,
+                 tokenizer: Tokenizer | None = None):
         self.data = filepath
+        # Words reported by save_results, see rank_words
+        self.top = top
+        self.by_frequency = by_frequency
+        # Splits the text into the counted words, see tokenizer.Tokenizer
+        self.tokenizer = tokenizer or Tokenizer()
     
-    def read_data_and_count_words(self) -> dict:
+    def read_data_and_count_words(self, workers: int = 1) -> dict:
         """
         Count the number of words in the file.
         Save the word count in a dictionary.
 
+        With more than one worker the file is split into newline-aligned
+        byte ranges that a pool of processes counts at the same time (map),
+        and their counts are merged by merge_counts (reduce). The counts
+        and their order are the same as with a single process.
+
+        Args:
+            workers (int): Number of processes counting the words.
+
         Returns:
-            list: _description_
+            dict: Count of every word, in order of first appearance.
         """
-        word_count = {}
-        try:
-            with open(self.data, 'r', encoding='utf-8') as f:
-                for line in f:
-                    words = line.split()
-                    for word in words:
-                        word = word.lower() 
-                        if word in word_count:
-                            word_count[word] += 1
-                        else:
-                            word_count[word] = 1
-        except FileNotFoundError:
+        if not os.path.isfile(self.data):
             print(f"Error: File {self.data} not found.")
+            return {}
+        if workers <= 1:
+            return count_words((self.data, 0, None, self.tokenizer))
+        tasks = [(self.data, start, end, self.tokenizer)
+                 for start, end in split_file(self.data, workers)]
+        with Pool(workers) as pool:
+            return merge_counts(pool.map(count_words, tasks), pool)
         
-        return word_count
-        
-    def save_results(self, word_count: dict, output_file: str, execution_time) -> None:
+    def count_words_external(self, max_words: int):
+        """
+        Count the words keeping at most about max_words distinct words in
+        memory, spilling the counts to temporary files sorted by word and
+        merging them at the end, see external_counts.count_external.
+
+        Args:
+            max_words (int): Distinct words that trigger a spill.
+
+        Returns:
+            Iterable of (word, count) pairs sorted by word, read while the
+            results are saved.
+        """
+        if not os.path.isfile(self.data):
+            print(f"Error: File {self.data} not found.")
+            return {}
+        return count_external((self.tokenizer.tokenize(block)
+                               for block in iter_blocks(self.data)), max_words)
+
+    def approximate_top_words(self, top: int, error: float = WORD_SKETCH_ERROR) -> list:
+        """
+        Approximate the most frequent words in fixed memory.
+
+        The counts go to a Count-Min sketch, and only the words whose
+        estimated count reaches the top ones are kept as candidates, between
+        top and 2 * top of them. Estimated counts are never below the real
+        ones and exceed them by at most error * words with probability 0.99.
+
+        Args:
+            top (int): Number of words to report.
+            error (float): Error of the estimated counts, as a fraction of
+                the words of the file.
+
+        Returns:
+            list: (word, estimated count) pairs, most frequent first.
+        """
+        if not os.path.isfile(self.data):
+            print(f"Error: File {self.data} not found.")
+            return []
+        sketch = CountMinSketch(error)
+        candidates = {}
+        threshold = 0
+        for block in iter_blocks(self.data):
+            block_count = Counter(self.tokenizer.tokenize(block))
+            for word, estimate in zip(block_count, sketch.update(block_count)):
+                if estimate > threshold or word in candidates:
+                    candidates[word] = estimate
+            if len(candidates) > 2 * top:
+                kept = heapq.nlargest(top, candidates.items(), key=itemgetter(1))
+                threshold = kept[-1][1]
+                kept = {word for word, _ in kept}
+                # Keep the order of first appearance for the ties
+                candidates = {word: estimate for word, estimate in candidates.items()
+                              if word in kept}
+        return heapq.nlargest(top, ((word, sketch.estimate(word)) for word in candidates),
+                              key=itemgetter(1))
+
+    def save_results(self, word_count: dict, output_file: str,
+                     start_time: float, verbose: bool = True) -> float:
         """
         Save the word count to a file.
 
+        Only the top words are saved if top is set, and sorted by count if
+        by_frequency is set, see rank_words. The lines are written in chunks
+        of SAVE_LINES, so the pairs of count_words_external are merged while
+        they are saved, without holding the whole vocabulary.
+
         Args:
-            word_count (dict): Dictionary with the word count.
+            word_count (dict): Dictionary with the word count, or iterable
+                of (word, count) pairs.
             output_file (str): Output file path.
+            start_time (float): Time the count started, the execution time
+                is measured up to the end of the saved words.
+            verbose (bool): Whether to also print every word count.
+
+        Returns:
+            float: Execution time.
         """
+        words = iter(rank_words(word_count, self.top, self.by_frequency))
         try:
             directory = os.path.dirname(output_file)
             os.makedirs(directory, exist_ok=True)
             with open(output_file, 'w', encoding='utf-8') as results_file:
-                for word, count in word_count.items():
-                    results_file.write(f"{word}: {count}\n")
-                    print(f"{word}: {count}")
+                while chunk := list(islice(words, SAVE_LINES)):
+                    lines = "".join([f"{word}: {count}\n" for word, count in chunk])
+                    results_file.write(lines)
+                    if verbose:
+                        sys.stdout.write(lines)
+                execution_time = time.time() - start_time
                 results_file.write(f"Execution time: {execution_time}s.")
+            return execution_time
         except OSError as e:
             print(f"Error saving the converted numbers to {output_file}: {e}")
-    
+            return time.time() - start_time
+
 def main():
     """
     Main function to count the words.
     """
+    arguments = parse_arguments(sys.argv[1:], FLAG_OPTIONS, VALUE_OPTIONS, 1)
+    if arguments is None:
+        return
+    args, options = arguments
+    settings = parse_count_options(options)
+    if settings is None:
+        return
+    workers, top, max_words, error, tokenizer = settings
     start_time = time.time()
     
-    file_ = sys.argv[1]
+    file_ = args[0]
     txt_filename = file_.split('/')[-1].split('.')[0]
-    word_count = CountWords(file_)
-    words_with_freq = word_count.read_data_and_count_words()
-    execution_time = time.time() - start_time
-    print(f"Execution time: {execution_time}s.")
-    word_count.save_results(
+    word_count = CountWords(file_, top, 'sorted' in options, tokenizer)
+    if 'approximate' in options:
+        words_with_freq = word_count.approximate_top_words(top or APPROXIMATE_TOP, error)
+    elif max_words is not None:
+        words_with_freq = word_count.count_words_external(max_words)
+    else:
+        words_with_freq = word_count.read_data_and_count_words(workers)
+    execution_time = word_count.save_results(
         words_with_freq, 
         f"results/P3/{txt_filename}/WordCountResults.txt", 
-        execution_time
+        start_time,
+        verbose='quiet' not in options
     )
+    print(f"Execution time: {execution_time}s.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,202 @@
+"""
+Module to compute the total cost of many sales files against a single
+price catalogue.
+"""
+import fnmatch
+import glob
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from compute_sales import (ComputeSales, parse_arguments,
+                           parse_engine_options, result_name)
+
+FLAG_OPTIONS = ("--no-cache",)
+VALUE_OPTIONS = ("--workers", "--engine")
+# Names of the sales files of a directory, e.g. TC1.Sales.json or the
+# Sales1000.jsonl files of benchmark_sales.py, so catalogues are skipped
+SALES_FILE_PATTERNS = ("*Sales*.json", "*Sales*.jsonl")
+SUMMARY_FILE = "results/BatchSummary.txt"
+
+_catalogue_price_index = {}
+
+
+def find_sales_files(pattern: str) -> list:
+    """
+    List the sales files of a directory or matching a glob pattern.
+
+    Only the files of a directory whose names match SALES_FILE_PATTERNS
+    are sales files; a glob pattern is taken as given.
+
+    Args:
+        pattern (str): Directory of sales files or glob pattern.
+
+    Returns:
+        list: Sorted paths of the sales files.
+    """
+    if os.path.isdir(pattern):
+        return sorted(
+            os.path.join(pattern, name) for name in os.listdir(pattern)
+            if any(fnmatch.fnmatchcase(name, sales_pattern)
+                   for sales_pattern in SALES_FILE_PATTERNS)
+            and os.path.isfile(os.path.join(pattern, name)))
+    return sorted(path for path in glob.glob(pattern, recursive=True)
+                  if os.path.isfile(path))
+
+
+def check_result_names(sales_files: list) -> bool:
+    """
+    Check that no two sales files save the same results directory, as
+    result_name keeps the file name up to its first dot.
+
+    Args:
+        sales_files (list): Paths of the sales files.
+
+    Returns:
+        bool: Whether every file has its own results directory. The files
+        that share one are printed otherwise.
+    """
+    files_by_name = {}
+    for sales_file in sales_files:
+        files_by_name.setdefault(result_name(sales_file), []).append(
+            sales_file)
+    unique = True
+    for name, files in files_by_name.items():
+        if len(files) > 1:
+            print(f"Error: {', '.join(files)} would save the same "
+                  f"results/{name}/SalesResults.txt.")
+            unique = False
+    return unique
+
+
+def _init_worker(price_index: dict) -> None:
+    """
+    Share the price index of the catalogue with a pool worker.
+
+    Args:
+        price_index (dict): Mapping of product title to its prices.
+    """
+    global _catalogue_price_index  # pylint: disable=global-statement
+    _catalogue_price_index = price_index
+
+
+def _price_sales_file(price_file: str, sales_file: str,
+                      engine: str) -> tuple:
+    """
+    Price a sales file against the shared price index and save its results.
+
+    Args:
+        price_file (str): Path of the price catalogue.
+        sales_file (str): Path of the sales file.
+        engine (str): Pricing engine.
+
+    Returns:
+        tuple: Results name, total cost and execution time of the file.
+    """
+    start_time = time.time()
+    compute_sales = ComputeSales(price_file, sales_file, streaming=True,
+                                 engine=engine)
+    compute_sales.price_index = _catalogue_price_index
+    compute_sales.compute_total_cost()
+    execution_time = time.time() - start_time
+    name = result_name(sales_file)
+    compute_sales.save_results(f"results/{name}/SalesResults.txt",
+                               execution_time)
+    return name, compute_sales.total_cost, execution_time
+
+
+def save_summary(filename: str, results: list, engine: str,
+                 execution_time: float) -> None:
+    """
+    Save and print the combined summary of a batch.
+
+    Args:
+        filename (str): Filename path to save the summary.
+        results (list): Results name, total cost and execution time of
+            every file.
+        engine (str): Pricing engine used for the totals.
+        execution_time (float): Execution time of the whole batch.
+    """
+    totals = [total for _, total, _ in results]
+    combined = sum(totals) if engine == "cents" else math.fsum(totals)
+    lines = ["\tTOTAL\tTIME"]
+    lines += [f"{name}\t{total:.2f}\t{elapsed:.6f}"
+              for name, total, elapsed in results]
+    lines += ["", f"Files: {len(results)}", f"Total sales: ${combined:.2f}",
+              f"Execution time: {execution_time:.6f}s."]
+    result_text = "\n".join(lines) + "\n"
+    print(result_text)
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(result_text)
+    except OSError as e:
+        print(f"Error writing the file {filename}: {e}")
+
+
+def run_batch(price_file: str, pattern: str, workers: int = 1,
+              engine: str = "scalar", catalogue_cache: bool = True) -> None:
+    """
+    Price many sales files against a catalogue loaded only once.
+
+    With more than one worker the files are priced concurrently by a pool
+    of processes that share the price index. Each file gets its own
+    results/<name>/SalesResults.txt and the combined summary is saved in
+    SUMMARY_FILE. The catalogue itself is skipped if the pattern matches it,
+    and nothing is priced if two files would save the same results.
+
+    Args:
+        price_file (str): Path of the price catalogue.
+        pattern (str): Directory of sales files or glob pattern.
+        workers (int): Number of files priced concurrently.
+        engine (str): Pricing engine.
+        catalogue_cache (bool): Whether to use the catalogue cache.
+    """
+    start_time = time.time()
+    catalogue = ComputeSales(price_file, None,
+                             catalogue_cache=catalogue_cache)
+    try:
+        catalogue.load_catalogue()
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error reading the file {price_file}: {e}")
+        return
+    sales_files = [sales_file for sales_file in find_sales_files(pattern)
+                   if not os.path.samefile(sales_file, price_file)]
+    if not sales_files:
+        print(f"Error: No sales files found in {pattern}.")
+        return
+    if not check_result_names(sales_files):
+        return
+    tasks = [(price_file, sales_file, engine) for sales_file in sales_files]
+    if workers > 1:
+        with Pool(workers, initializer=_init_worker,
+                  initargs=(catalogue.price_index,)) as pool:
+            results = pool.starmap(_price_sales_file, tasks)
+    else:
+        _init_worker(catalogue.price_index)
+        results = [_price_sales_file(*task) for task in tasks]
+    execution_time = time.time() - start_time
+    save_summary(SUMMARY_FILE, results, engine, execution_time)
+
+
+def main():
+    """
+    Main function to compute the total cost of a batch of sales files.
+    """
+    arguments = parse_arguments(sys.argv[1:], FLAG_OPTIONS, VALUE_OPTIONS)
+    if arguments is not None and len(arguments[0]) != 2:
+        print("Error: Invalid quantity of arguments. Please check.")
+    elif arguments is not None:
+        (price_file, pattern), options = arguments
+        engine_options = parse_engine_options(options)
+        if engine_options is not None:
+            workers, engine = engine_options
+            run_batch(price_file, pattern, workers=workers, engine=engine,
+                      catalogue_cache=not options.get("no-cache", False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Module to benchmark ComputeSales on synthetic price catalogues and sales
+records of configurable size.
+"""
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from compute_sales import (ComputeSales, np, parse_arguments,
+                           parse_engine_options)
+
+FLAG_OPTIONS = ("--stream", "--cache")
+VALUE_OPTIONS = ("--sizes", "--products", "--skew", "--unknown", "--invalid",
+                 "--seed", "--format", "--engine", "--workers", "--data-dir",
+                 "--output")
+DEFAULT_CONFIG = {
+    "sizes": [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6],
+    "products": 10000,
+    "skew": 1.1,
+    "unknown": 0.01,
+    "invalid": 0.01,
+    "seed": 0,
+    "format": "json",
+    "engine": "scalar",
+    "workers": 1,
+    "stream": False,
+    "cache": False,
+}
+PRODUCT_TYPES = ("dairy", "fruit", "vegetable", "bakery", "meat", "drinks")
+GENERATE_BATCH_SIZE = 10000
+
+
+def generate_catalogue(filename: str, products: int, seed: int = 0) -> list:
+    """
+    Write a synthetic price catalogue with the fields of ProductList.json.
+
+    Args:
+        filename (str): Path of the catalogue to write.
+        products (int): Number of products.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        list: Titles of the products, in catalogue order.
+    """
+    rng = random.Random(seed)
+    catalogue = [
+        {
+            "title": f"Product {index}",
+            "type": rng.choice(PRODUCT_TYPES),
+            "description": f"Synthetic product number {index}",
+            "filename": f"{index}.jpg",
+            "height": 600,
+            "width": 400,
+            "price": round(rng.uniform(0.5, 100.0), 2),
+            "rating": rng.randint(1, 5),
+        }
+        for index in range(products)
+    ]
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(catalogue, f, indent=2)
+    return [product["title"] for product in catalogue]
+
+
+def _sale_records(rng: random.Random, products: list, first: int,
+                  unknown: float, invalid: float) -> list:
+    """
+    Build the JSON records of a batch of sale lines.
+
+    Args:
+        rng (random.Random): Random generator.
+        products (list): Product title of every line of the batch.
+        first (int): Index of the first line of the batch.
+        unknown (float): Share of lines for unknown products.
+        invalid (float): Share of lines with a non-numeric quantity.
+
+    Returns:
+        list: JSON text of every sale record.
+    """
+    records = []
+    for offset, product in enumerate(products):
+        draw = rng.random()
+        if draw < unknown:
+            product = f"Unknown product {rng.randrange(1 << 30)}"
+        quantity = rng.randint(1, 10)
+        if unknown <= draw < unknown + invalid:
+            quantity = str(quantity)
+        sale_id = (first + offset) // 3 + 1
+        records.append(json.dumps({
+            "SALE_ID": sale_id,
+            "SALE_Date": f"{sale_id % 28 + 1:02d}/12/23",
+            "Product": product,
+            "Quantity": quantity,
+        }))
+    return records
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def generate_sales(filename: str, lines: int, titles: list,
+                   skew: float = 1.1, unknown: float = 0.01,
+                   invalid: float = 0.01, seed: int = 0,
+                   file_format: str = "json") -> None:
+    """
+    Write a synthetic sales record with the fields of the TC files.
+
+    Product popularity follows a Zipf law of exponent skew, so a few
+    products get most of the sales. The records are generated and written
+    in batches, so memory does not grow with the number of lines.
+
+    Args:
+        filename (str): Path of the sales file to write.
+        lines (int): Number of sale lines.
+        titles (list): Titles of the catalogue.
+        skew (float): Zipf exponent of the product popularity, 0 for
+            uniform popularity.
+        unknown (float): Share of lines for products missing from the
+            catalogue.
+        invalid (float): Share of lines with a non-numeric quantity.
+        seed (int): Seed of the random generator.
+        file_format (str): "json" for a JSON array, "jsonl" for JSON Lines.
+    """
+    rng = random.Random(seed)
+    cum_weights = list(accumulate(
+        1 / (rank + 1) ** skew for rank in range(len(titles))))
+    with open(filename, 'w', encoding='utf-8') as f:
+        if file_format == "json":
+            f.write("[\n")
+        for first in range(0, lines, GENERATE_BATCH_SIZE):
+            products = rng.choices(titles, cum_weights=cum_weights,
+                                   k=min(GENERATE_BATCH_SIZE, lines - first))
+            records = _sale_records(rng, products, first, unknown, invalid)
+            if file_format == "json":
+                separator = "," if first + len(products) < lines else ""
+                f.write(",\n".join(records) + separator + "\n")
+            else:
+                f.write("\n".join(records) + "\n")
+        if file_format == "json":
+            f.write("]\n")
+
+
+def _measure(price_file: str, sales_file: str, config: dict) -> dict:
+    """
+    Time load_data and compute_total_cost on a sales file.
+
+    Runs in a fresh process, so the peak RSS only covers this measurement.
+
+    Args:
+        price_file (str): Path of the price catalogue.
+        sales_file (str): Path of the sales file.
+        config (dict): Benchmark configuration.
+
+    Returns:
+        dict: Timings, total cost and peak RSS of the run.
+    """
+    compute_sales = ComputeSales(price_file, sales_file,
+                                 streaming=config["stream"],
+                                 workers=config["workers"],
+                                 engine=config["engine"],
+                                 catalogue_cache=config["cache"])
+    start_time = time.perf_counter()
+    compute_sales.load_data()
+    load_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    compute_sales.compute_total_cost()
+    compute_time = time.perf_counter() - start_time
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024
+    return {
+        "load_data_s": load_time,
+        "compute_total_cost_s": compute_time,
+        "total_cost": float(compute_sales.total_cost),
+        "peak_rss_kb": peak_rss,
+    }
+
+
+def run_benchmark(config: dict, data_dir: str) -> dict:
+    """
+    Generate the synthetic data of every size and measure each of them.
+
+    Args:
+        config (dict): Benchmark configuration.
+        data_dir (str): Directory for the generated files.
+
+    Returns:
+        dict: Environment, configuration and results of every size.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    price_file = os.path.join(data_dir, "ProductList.json")
+    titles = generate_catalogue(price_file, config["products"],
+                                config["seed"])
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for lines in config["sizes"]:
+        sales_file = os.path.join(
+            data_dir, f"Sales{lines}.{config['format']}")
+        generate_sales(sales_file, lines, titles, config["skew"],
+                       config["unknown"], config["invalid"], config["seed"],
+                       config["format"])
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            result = executor.submit(_measure, price_file, sales_file,
+                                     config).result()
+        total_time = result["load_data_s"] + result["compute_total_cost_s"]
+        result.update({
+            "lines": lines,
+            "file_bytes": os.path.getsize(sales_file),
+            "load_data_lines_per_s": lines / max(result["load_data_s"],
+                                                 1e-9),
+            "compute_total_cost_lines_per_s": lines / max(
+                result["compute_total_cost_s"], 1e-9),
+            "lines_per_s": lines / max(total_time, 1e-9),
+        })
+        print(f"{lines} lines: load_data {result['load_data_s']:.6f}s, "
+              f"compute_total_cost {result['compute_total_cost_s']:.6f}s, "
+              f"{result['lines_per_s']:.0f} lines/s, "
+              f"peak RSS {result['peak_rss_kb']} KB")
+        results.append(result)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np is not None,
+        "config": config,
+        "results": results,
+    }
+
+
+def parse_config(options: dict) -> dict | None:
+    """
+    Build the benchmark configuration from the command line options.
+
+    Args:
+        options (dict): Options returned by parse_arguments.
+
+    Returns:
+        dict | None: Benchmark configuration, or None if an option is
+        invalid.
+    """
+    config = dict(DEFAULT_CONFIG)
+    try:
+        if "sizes" in options:
+            config["sizes"] = [int(float(size))
+                               for size in options["sizes"].split(",")]
+        for name in ("products", "seed"):
+            config[name] = int(options.get(name, config[name]))
+        for name in ("skew", "unknown", "invalid"):
+            config[name] = float(options.get(name, config[name]))
+    except ValueError as e:
+        print(f"Error: Invalid option value: {e}")
+        return None
+    engine_options = parse_engine_options(options)
+    if engine_options is None:
+        return None
+    config["workers"], config["engine"] = engine_options
+    for name in ("format", "stream", "cache"):
+        config[name] = options.get(name, config[name])
+    if config["format"] not in ("json", "jsonl"):
+        print("Error: --format must be json or jsonl.")
+        return None
+    if (config["format"] == "jsonl" and not config["stream"]
+            and config["workers"] == 1):
+        print("Error: --format jsonl needs --stream or --workers.")
+        return None
+    if min(config["sizes"]) < 1 or config["products"] < 1:
+        print("Error: --sizes and --products must be positive.")
+        return None
+    return config
+
+
+def main():
+    """
+    Main function to benchmark ComputeSales.
+    """
+    arguments = parse_arguments(sys.argv[1:], FLAG_OPTIONS, VALUE_OPTIONS)
+    if arguments is None:
+        return
+    args, options = arguments
+    config = parse_config(options)
+    if args or config is None:
+        if args:
+            print("Error: Invalid quantity of arguments. Please check.")
+        return
+    output = options.get("output", "results/Benchmark.json")
+    if "data-dir" in options:
+        report = run_benchmark(config, options["data-dir"])
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            report = run_benchmark(config, data_dir)
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    try:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        print(f"Error writing the file {output}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,53 +2,831 @@
 Module to compute the total cost of sales given a price catalogue and
 a sales record.
 """
+import csv
+import hashlib
 import json
+import math
+import operator
 import os
+import pickle
+import re
 import time
 import sys
+from decimal import Decimal, ROUND_HALF_EVEN
+from itertools import islice
+from multiprocessing import Pool
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the array module is the fallback
+    np = None
 
-class ComputeSales:
+FLAG_OPTIONS = ("--stream", "--no-cache", "--incremental")
+VALUE_OPTIONS = ("--workers", "--report", "--group-by", "--engine")
+ENGINES = ("scalar", "cents")
+READ_CHUNK_SIZE = 1 << 16
+CATALOGUE_CACHE_SUFFIX = ".cache"
+CATALOGUE_CACHE_VERSION = 1
+CHECKPOINT_VERSION = 2
+# Bytes before the checkpoint offset whose digest identifies the sales log
+CHECKPOINT_TAIL_SIZE = 4096
+# Lines per batch of the cents engine and bound of the values kept in its
+# int64 columns, so the sum of a batch of products cannot overflow
+CENTS_BATCH_SIZE = 1 << 14
+CENTS_COLUMN_LIMIT = 1 << 24
+SHARD_SIZE = 1 << 24
+# Separator between two records of a JSON array of flat sale objects
+RECORD_SEPARATOR = re.compile(rb"\}\s*,\s*\{")
+# Rest of a buffer that may be the start of a number, literal or escape
+# cut by the chunk boundary
+PARTIAL_TOKEN = re.compile(r"[\w.+\\-]*")
+
+_shared_price_index = {}
+
+
+def _is_cut_record(buffer: str, error: json.JSONDecodeError) -> bool:
+    """
+    Tell whether a decoding error may come from a record cut by the end of
+    the buffer, so reading more data could fix it.
+
+    Args:
+        buffer (str): Data being decoded.
+        error (json.JSONDecodeError): Error of the decoding.
+
+    Returns:
+        bool: True if the error reaches the end of the buffer, False for a
+        syntax error in the data already read.
+    """
+    return (error.msg.startswith("Unterminated string")
+            or PARTIAL_TOKEN.fullmatch(buffer, error.pos) is not None)
+
+
+def _iter_json_array(f, buffer: str):
+    """
+    Decode the records of a top-level JSON array one at a time.
+
+    Args:
+        f: Text file positioned right after the opening bracket.
+        buffer (str): Data already read after the opening bracket.
+
+    Yields:
+        dict: Each record of the array.
+    """
+    decoder = json.JSONDecoder()
+    pos = 0
+    eof = False
+    while True:
+        # Skip whitespace and separators between records
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            buffer = f.read(READ_CHUNK_SIZE)
+            eof = buffer == ""
+            pos = 0
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof or not _is_cut_record(buffer, e):
+                raise
+            end = len(buffer)
+        if end == len(buffer) and not eof:
+            # The record may be cut by the chunk boundary, read more
+            chunk = f.read(READ_CHUNK_SIZE)
+            eof = chunk == ""
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield record
+        pos = end
+
+
+def iter_sales(sales_file: str):
+    """
+    Stream the sale records of a sales file without loading it whole.
+
+    The file may hold a top-level JSON array of sales, which is decoded
+    one record at a time, or JSON Lines with one sale per line.
+
+    Args:
+        sales_file (str): Path of the sales file.
+
+    Yields:
+        dict: Each sale record.
+
+    Raises:
+        FileNotFoundError: If the sales file does not exist.
+        json.JSONDecodeError: If a record is not valid JSON, after the
+            records before it were yielded.
+    """
+    with open(sales_file, 'r', encoding='utf-8') as f:
+        buffer = ""
+        chunk = f.read(READ_CHUNK_SIZE)
+        while chunk and buffer == "":
+            buffer = chunk.lstrip()
+            chunk = f.read(READ_CHUNK_SIZE) if buffer == "" else chunk
+        if buffer.startswith("["):
+            yield from _iter_json_array(f, buffer[1:])
+        else:
+            # JSON Lines: one sale record per non-empty line
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def add_exact(partials: list, value: float) -> None:
+    """
+    Add a value to a list of non-overlapping partial sums.
+
+    The partials hold the exact sum of every value added so far
+    (Shewchuk's algorithm, the one behind math.fsum), so partial lists
+    built on different shards can be merged with math.fsum without any
+    rounding error.
+
+    Args:
+        partials (list): Partial sums, updated in place.
+        value (float): Value to add.
+    """
+    i = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+def aggregate_sale(breakdown: dict, group_by: tuple, sale: dict,
+                   amounts: list, quantity: float) -> None:
+    """
+    Add a priced sale line to the revenue, units and lines of its groups.
+
+    Args:
+        breakdown (dict): Mapping of field -> value -> [revenue partial
+            sums, units, lines], updated in place.
+        group_by (tuple): Sale record fields to group by.
+        sale (dict): Sale record.
+        amounts (list): Amounts charged for the sale line.
+        quantity (float): Quantity sold.
+    """
+    for field in group_by:
+        group = breakdown.setdefault(field, {}).setdefault(
+            sale.get(field), [[], 0, 0])
+        for amount in amounts:
+            add_exact(group[0], amount)
+        group[1] += quantity
+        group[2] += 1
+
+
+def merge_breakdowns(breakdown: dict, other: dict) -> None:
+    """
+    Merge the groups of another breakdown into a breakdown.
+
+    Args:
+        breakdown (dict): Breakdown updated in place.
+        other (dict): Breakdown to merge.
+    """
+    for field, groups in other.items():
+        field_groups = breakdown.setdefault(field, {})
+        for value, (revenue, units, lines) in groups.items():
+            group = field_groups.setdefault(value, [[], 0, 0])
+            for partial in revenue:
+                add_exact(group[0], partial)
+            group[1] += units
+            group[2] += lines
+
+
+def is_json_array(sales_file: str) -> bool:
+    """
+    Tell whether a sales file holds a JSON array or JSON Lines.
+
+    Args:
+        sales_file (str): Path of the sales file.
+
+    Returns:
+        bool: True if the first non-blank character is an opening bracket.
+    """
+    with open(sales_file, 'rb') as f:
+        chunk = f.read(READ_CHUNK_SIZE)
+        while chunk:
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped.startswith(b"[")
+            chunk = f.read(READ_CHUNK_SIZE)
+    return False
+
+
+def _align_offset(f, offset: int, json_array: bool) -> int:
+    """
+    Move a byte offset forward to the start of the next sale record.
+
+    Args:
+        f: Binary sales file.
+        offset (int): Byte offset to align.
+        json_array (bool): Whether the file is a JSON array or JSON Lines.
+
+    Returns:
+        int: Offset of the next record, or the file size if there is none.
+    """
+    f.seek(offset)
+    buffer = b""
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        buffer += chunk
+        if json_array:
+            match = RECORD_SEPARATOR.search(buffer)
+            if match:
+                return offset + match.end() - 1
+        else:
+            newline = buffer.find(b"\n")
+            if newline != -1:
+                return offset + newline + 1
+        if not chunk:
+            return offset + len(buffer)
+        if json_array:
+            # Keep a tail in case a separator is cut by the chunk boundary
+            keep = min(len(buffer), READ_CHUNK_SIZE)
+            offset += len(buffer) - keep
+            buffer = buffer[-keep:]
+        else:
+            offset += len(buffer)
+            buffer = b""
+
+
+def split_sales_file(sales_file: str, shards: int) -> list:
+    """
+    Split a sales file into byte ranges that start on a record boundary.
+
+    JSON arrays are expected to hold flat sale objects, as in the test
+    cases, so a record starts at the brace that follows a "}," separator.
+
+    Args:
+        sales_file (str): Path of the sales file.
+        shards (int): Number of byte ranges wanted.
+
+    Returns:
+        list: Tuples (start, end) of byte offsets covering every record.
+    """
+    json_array = is_json_array(sales_file)
+    size = os.path.getsize(sales_file)
+    with open(sales_file, 'rb') as f:
+        first = 0
+        if json_array:
+            first = f.read(READ_CHUNK_SIZE).index(b"[") + 1
+        bounds = [first]
+        for shard in range(1, shards):
+            offset = max(first + size * shard // shards, bounds[-1])
+            bounds.append(_align_offset(f, offset, json_array))
+        bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:])
+            if start < end]
+
+
+def _init_worker(price_index: dict) -> None:
+    """
+    Share the read-only price index with a pool worker.
+
+    Args:
+        price_index (dict): Mapping of product title to its prices.
+    """
+    global _shared_price_index  # pylint: disable=global-statement
+    _shared_price_index = price_index
+
+
+def _price_shard(sales_file: str, start: int, end: int,
+                 json_array: bool, group_by: tuple) -> tuple:
+    """
+    Price the sales found in a byte range of the sales file.
+
+    Args:
+        sales_file (str): Path of the sales file.
+        start (int): First byte of the range, at a record start.
+        end (int): Byte after the range.
+        json_array (bool): Whether the file is a JSON array or JSON Lines.
+        group_by (tuple): Sale record fields to group by.
+
+    Returns:
+        tuple: Exact partial sums of the shard total and shard breakdown.
+    """
+    with open(sales_file, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8").strip()
+    if json_array:
+        text = text.rstrip("]").rstrip().rstrip(",")
+        sales = json.loads(f"[{text}]")
+    else:
+        sales = [json.loads(line) for line in text.splitlines()
+                 if line.strip()]
+    partials = []
+    breakdown = {}
+    for sale in sales:
+        product_quantity_sale = sale.get("Quantity", 0)
+        if not isinstance(product_quantity_sale, (int, float)):
+            continue
+        amounts = [product_price * product_quantity_sale for product_price
+                   in _shared_price_index.get(sale.get("Product"), ())]
+        for amount in amounts:
+            add_exact(partials, amount)
+        if group_by:
+            aggregate_sale(breakdown, group_by, sale, amounts,
+                           product_quantity_sale)
+    return partials, breakdown
+
+
+def file_fingerprint(filename: str) -> str:
+    """
+    Compute the SHA-256 digest of a file.
+
+    Args:
+        filename (str): Path of the file.
+
+    Returns:
+        str: Hexadecimal digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_catalogue_cache(cache_file: str) -> dict | None:
+    """
+    Read a compiled catalogue cache.
+
+    Args:
+        cache_file (str): Path of the cache file.
+
+    Returns:
+        dict | None: Cache content, or None if it is missing or unreadable.
+    """
+    try:
+        with open(cache_file, 'rb') as f:
+            cache = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+            ValueError):
+        return None
+    if (not isinstance(cache, dict)
+            or cache.get("version") != CATALOGUE_CACHE_VERSION):
+        return None
+    return cache
+
+
+def _write_catalogue_cache(cache_file: str, cache: dict) -> None:
+    """
+    Write a compiled catalogue cache atomically.
+
+    The cache is an optimization, so failing to write it is not an error.
+
+    Args:
+        cache_file (str): Path of the cache file.
+        cache (dict): Cache content.
+    """
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def _tail_digest(f, offset: int) -> str:
+    """
+    Compute the SHA-256 digest of the bytes right before an offset.
+
+    Args:
+        f: Binary file.
+        offset (int): Byte offset.
+
+    Returns:
+        str: Hexadecimal digest of up to CHECKPOINT_TAIL_SIZE bytes.
+    """
+    start = max(0, offset - CHECKPOINT_TAIL_SIZE)
+    f.seek(start)
+    return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def read_checkpoint(checkpoint_file: str) -> dict | None:
+    """
+    Read an incremental checkpoint.
+
+    Args:
+        checkpoint_file (str): Path of the checkpoint file.
+
+    Returns:
+        dict | None: Checkpoint, or None if it is missing or unreadable.
+    """
+    try:
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if (not isinstance(checkpoint, dict)
+            or checkpoint.get("version") != CHECKPOINT_VERSION):
+        return None
+    return checkpoint
+
+
+def write_checkpoint(checkpoint_file: str, checkpoint: dict) -> None:
+    """
+    Write an incremental checkpoint atomically.
+
+    Args:
+        checkpoint_file (str): Path of the checkpoint file.
+        checkpoint (dict): Checkpoint content.
+    """
+    directory = os.path.dirname(checkpoint_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_file = f"{checkpoint_file}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(temp_file, checkpoint_file)
+    except OSError as e:
+        print(f"Error writing the file {checkpoint_file}: {e}")
+
+
+def to_cents(price: float) -> int:
+    """
+    Convert a price to an integer number of cents.
+
+    Args:
+        price (float): Price as written in the catalogue.
+
+    Returns:
+        int: Price in cents, rounded half to even.
+    """
+    return int(Decimal(repr(price)).scaleb(2).quantize(
+        Decimal(1), rounding=ROUND_HALF_EVEN))
+
+
+class CentsPricingEngine:
+    """
+    Pricing engine that computes exact totals in integer cents.
+
+    Sale lines are priced in batches: the price and quantity columns of a
+    batch are built with list comprehensions and multiplied as int64
+    columns, with NumPy when it is installed and the standard library
+    otherwise. Lines that do not fit the columns (fractional or very large
+    quantities, very large prices) are added exactly with Decimal.
+    """
+    def __init__(self, price_index: dict) -> None:
+        self.cents_index = {title: sum(to_cents(price) for price in prices
+                                       if isinstance(price, (int, float)))
+                            for title, prices in price_index.items()}
+        self.column_index = {title: cents for title, cents
+                             in self.cents_index.items()
+                             if abs(cents) < CENTS_COLUMN_LIMIT}
+        self.column_cents = 0
+        self.exact_cents = Decimal(0)
+
+    def add_sales(self, sales: list) -> None:
+        """
+        Add a batch of at most CENTS_BATCH_SIZE sale records to the engine.
+
+        Args:
+            sales (list): Sale records.
+        """
+        prices = [self.column_index.get(sale.get("Product"), 0)
+                  for sale in sales]
+        quantities = [sale.get("Quantity", 0) for sale in sales]
+        column = [quantity if isinstance(quantity, int)
+                  and abs(quantity) < CENTS_COLUMN_LIMIT else 0
+                  for quantity in quantities]
+        if np is not None:
+            column = np.fromiter(column, dtype=np.int64, count=len(column))
+            self.column_cents += int(np.dot(np.fromiter(
+                prices, dtype=np.int64, count=len(prices)), column))
+            skipped = set(np.flatnonzero(column == 0).tolist())
+        else:
+            self.column_cents += sum(map(operator.mul, prices, column))
+            skipped = {i for i, quantity in enumerate(column) if not quantity}
+        if len(self.column_index) < len(self.cents_index):
+            skipped.update(i for i, sale in enumerate(sales)
+                           if sale.get("Product") not in self.column_index)
+        for i in skipped:
+            quantity = quantities[i]
+            if isinstance(quantity, float):
+                quantity = Decimal(repr(quantity))
+            elif not isinstance(quantity, int):
+                continue
+            self.exact_cents += self.cents_index.get(
+                sales[i].get("Product"), 0) * quantity
+
+    def total(self) -> Decimal:
+        """
+        Return the exact total of every line added so far.
+
+        Returns:
+            Decimal: Total in currency units.
+        """
+        return (self.column_cents + self.exact_cents).scaleb(-2)
+
+
+class ComputeSales:  # pylint: disable=too-many-instance-attributes
     """
     Class to compute the total cost of sales given a price catalogue
     and a sales record.
     """
-    def __init__(self, price_file: json, sales_file: json) -> None:
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(self, price_file: json, sales_file: json,
+                 streaming: bool = False, workers: int = 1,
+                 group_by: tuple = (), engine: str = "scalar",
+                 catalogue_cache: bool = True,
+                 checkpoint_file: str | None = None) -> None:
         self.price_file = price_file
         self.sales_file = sales_file
+        self.streaming = streaming
+        self.workers = workers
+        self.group_by = group_by
+        self.engine = engine
+        self.catalogue_cache = catalogue_cache
+        self.checkpoint_file = checkpoint_file
+        self.breakdown = {}
         self.products = {}
+        self.price_index = {}
+        self.catalogue_fingerprint = None
         self.sales = []
         self.total_cost = 0.0
 
+    @staticmethod
+    def build_price_index(products: list) -> dict:
+        """
+        Build a title -> prices index from the price catalogue.
+
+        Duplicated titles keep every price in catalogue order, so a sale
+        of a duplicated title is charged once per catalogue entry, as in
+        a full scan of the catalogue.
+
+        Args:
+            products (list): Price catalogue records.
+
+        Returns:
+            dict: Mapping of product title to the list of its prices.
+        """
+        price_index = {}
+        for product in products:
+            price_index.setdefault(product.get("title"), []).append(
+                product.get("price"))
+        return price_index
+
     def load_data(self) -> None:
         """
         Load the price catalogue and sales record from the JSON files.
+
+        In streaming, parallel and incremental modes only the catalogue is
+        loaded; the sales are read by compute_total_cost.
         """
         try:
-            with open(self.price_file, 'r', encoding='utf-8') as f:
-                self.products = json.load(f)
+            self.load_catalogue()
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error reading the file {self.price_file}: {e}")
 
+        if self.streaming or self.workers > 1 or self.checkpoint_file:
+            return
         try:
             with open(self.sales_file, 'r', encoding='utf-8') as f:
                 self.sales = json.load(f)
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error reading the file {self.sales_file}: {e}")
 
+    def load_catalogue(self) -> None:
+        """
+        Load the price catalogue and its price index.
+
+        A compiled copy of the catalogue is kept in a cache file next to
+        it. The cache is used while the catalogue keeps the same
+        modification time and size, or the same SHA-256 digest, and is
+        rebuilt from the JSON file otherwise.
+        """
+        if not self.catalogue_cache:
+            with open(self.price_file, 'r', encoding='utf-8') as f:
+                self.products = json.load(f)
+            self.price_index = self.build_price_index(self.products)
+            return
+        stat = os.stat(self.price_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cache_file = self.price_file + CATALOGUE_CACHE_SUFFIX
+        cache = _read_catalogue_cache(cache_file)
+        if cache is None or cache["stamp"] != stamp:
+            fingerprint = file_fingerprint(self.price_file)
+            if cache is None or cache["fingerprint"] != fingerprint:
+                with open(self.price_file, 'r', encoding='utf-8') as f:
+                    products = json.load(f)
+                cache = {
+                    "version": CATALOGUE_CACHE_VERSION,
+                    "fingerprint": fingerprint,
+                    "products": products,
+                    "price_index": self.build_price_index(products),
+                }
+            cache["stamp"] = stamp
+            _write_catalogue_cache(cache_file, cache)
+        self.products = cache["products"]
+        self.price_index = cache["price_index"]
+        self.catalogue_fingerprint = cache["fingerprint"]
+
     def compute_total_cost(self) -> None:
         """
         Compute the total cost of sales.
+
+        In streaming mode the running total is updated while the sales
+        file is read, so memory does not grow with the number of sales.
+        With more than one worker the total is computed by
+        compute_total_cost_parallel. When group_by fields are given, the
+        revenue, units and lines of each group are aggregated in the same
+        pass into self.breakdown.
+
+        The default "scalar" engine adds float amounts one at a time and is
+        the reference mode; the "cents" engine computes an exact total with
+        CentsPricingEngine. With a checkpoint file the total is computed by
+        compute_total_cost_incremental. If the sales cannot be read the
+        error is printed and the total is left at zero, as when the whole
+        file is loaded.
         """
-        for sale in self.sales:
-            product_name_sale = sale.get("Product")
+        if self.checkpoint_file:
+            try:
+                json_array = is_json_array(self.sales_file)
+            except FileNotFoundError as e:
+                print(f"Error reading the file {self.sales_file}: {e}")
+                return
+            if json_array:
+                print("Incremental mode needs a JSON Lines sales file. "
+                      "Computing the full total.")
+                self.checkpoint_file = None
+                self.streaming = True
+            else:
+                self.compute_total_cost_incremental()
+                return
+        if self.workers > 1:
+            self.compute_total_cost_parallel()
+            return
+        sales = iter_sales(self.sales_file) if self.streaming else self.sales
+        try:
+            if self.engine == "cents":
+                self.compute_total_cost_cents(sales)
+            else:
+                self.compute_total_cost_scalar(sales)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error reading the file {self.sales_file}: {e}")
+            self.total_cost = 0.0
+            self.breakdown = {}
+
+    def compute_total_cost_scalar(self, sales) -> None:
+        """
+        Compute the total cost of sales adding float amounts one at a time.
+
+        Args:
+            sales: Iterable of sale records.
+        """
+        for sale in sales:
             product_quantity_sale = sale.get("Quantity", 0)
-            for product in self.products:
-                product_name = product.get("title")
-                product_price = product.get("price")
-                if (product_name_sale == product_name and
-                        isinstance(product_quantity_sale, (int, float))):
-                    self.total_cost += product_price * product_quantity_sale
+            if not isinstance(product_quantity_sale, (int, float)):
+                continue
+            amounts = [product_price * product_quantity_sale for product_price
+                       in self.price_index.get(sale.get("Product"), ())]
+            for amount in amounts:
+                self.total_cost += amount
+            if self.group_by:
+                aggregate_sale(self.breakdown, self.group_by, sale, amounts,
+                               product_quantity_sale)
+
+    def compute_total_cost_cents(self, sales) -> None:
+        """
+        Compute the exact total cost of sales in integer cents.
+
+        Args:
+            sales: Iterable of sale records.
+        """
+        engine = CentsPricingEngine(self.price_index)
+        sales = iter(sales)
+        while batch := list(islice(sales, CENTS_BATCH_SIZE)):
+            engine.add_sales(batch)
+            for sale in batch if self.group_by else ():
+                product_quantity_sale = sale.get("Quantity", 0)
+                if not isinstance(product_quantity_sale, (int, float)):
+                    continue
+                amounts = [price * product_quantity_sale for price
+                           in self.price_index.get(sale.get("Product"), ())]
+                aggregate_sale(self.breakdown, self.group_by, sale, amounts,
+                               product_quantity_sale)
+        self.total_cost = engine.total()
+
+    def compute_total_cost_incremental(self) -> None:
+        """
+        Compute the total cost of an append-only JSON Lines sales log.
+
+        The checkpoint file keeps the byte offset already priced, the exact
+        running total, the partials of every group (per product and per
+        group_by field) and the catalogue fingerprint, so only the records
+        appended since the previous run are priced. Everything is
+        recomputed when the catalogue or the group_by fields change, or the
+        log was truncated or rewritten. A last line without its newline is
+        left for the next run.
+        """
+        try:
+            fingerprint = (self.catalogue_fingerprint
+                           or file_fingerprint(self.price_file))
+        except FileNotFoundError:  # Reported by load_data
+            return
+        group_by = self.group_by or ("Product",)
+        checkpoint = read_checkpoint(self.checkpoint_file)
+        try:
+            with open(self.sales_file, 'rb') as f:
+                offset = 0
+                partials = []
+                breakdown = {field: {} for field in group_by}
+                if (checkpoint is not None
+                        and checkpoint["catalogue"] == fingerprint
+                        and checkpoint["group_by"] == list(group_by)
+                        and checkpoint["offset"] <= os.path.getsize(
+                            self.sales_file)
+                        and checkpoint["tail"] == _tail_digest(
+                            f, checkpoint["offset"])):
+                    offset = checkpoint["offset"]
+                    partials = checkpoint["total"]
+                    breakdown = {field: {value: group
+                                         for value, *group in groups}
+                                 for field, groups in checkpoint["groups"]}
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    sale = json.loads(line)
+                    product_quantity_sale = sale.get("Quantity", 0)
+                    if not isinstance(product_quantity_sale, (int, float)):
+                        continue
+                    amounts = [product_price * product_quantity_sale
+                               for product_price
+                               in self.price_index.get(sale.get("Product"),
+                                                       ())]
+                    for amount in amounts:
+                        add_exact(partials, amount)
+                    aggregate_sale(breakdown, group_by, sale, amounts,
+                                   product_quantity_sale)
+                tail = _tail_digest(f, offset)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error reading the file {self.sales_file}: {e}")
+            return
+        self.total_cost = math.fsum(partials)
+        self.breakdown = breakdown
+        write_checkpoint(self.checkpoint_file, {
+            "version": CHECKPOINT_VERSION,
+            "catalogue": fingerprint,
+            "group_by": list(group_by),
+            "offset": offset,
+            "tail": tail,
+            "total": partials,
+            "groups": [[field, [[value, *group] for value, group
+                                in groups.items()]]
+                       for field, groups in breakdown.items()],
+        })
+
+    def compute_total_cost_parallel(self) -> None:
+        """
+        Compute the total cost of sales with a pool of worker processes.
+
+        The sales file is split into byte-range shards that are priced by
+        the workers against the shared catalogue. The shard totals are
+        exact partial sums merged with math.fsum, so the total does not
+        depend on the number of workers.
+        """
+        try:
+            json_array = is_json_array(self.sales_file)
+            shards = max(self.workers,
+                         os.path.getsize(self.sales_file) // SHARD_SIZE)
+            ranges = split_sales_file(self.sales_file, shards)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"Error reading the file {self.sales_file}: {e}")
+            return
+        tasks = [(self.sales_file, start, end, json_array, self.group_by)
+                 for start, end in ranges]
+        try:
+            with Pool(self.workers, initializer=_init_worker,
+                      initargs=(self.price_index,)) as pool:
+                shard_results = pool.starmap(_price_shard, tasks)
+        except json.JSONDecodeError as e:
+            print(f"Error reading the file {self.sales_file}: {e}")
+            return
+        self.total_cost = math.fsum(
+            partial for partials, _ in shard_results for partial in partials)
+        for _, breakdown in shard_results:
+            merge_breakdowns(self.breakdown, breakdown)
 
     def save_results(self, filename: str, execution_time: float) -> None:
         """
@@ -72,23 +850,149 @@ class ComputeSales:
         except FileNotFoundError as e:
             print(f"Error writing the file {filename}: {e}")
 
+    def save_report(self, filename: str) -> None:
+        """
+        Save the grouped breakdown as a CSV report, or JSON if the filename
+        ends with .json.
+
+        Args:
+            filename (str): Filename path to save the report.
+        """
+        rows = [
+            {"group": field, "value": value,
+             "revenue": round(math.fsum(revenue), 2),
+             "units": units, "lines": lines}
+            for field, groups in self.breakdown.items()
+            for value, (revenue, units, lines) in groups.items()
+        ]
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(filename, "w", encoding="utf-8", newline="") as f:
+                if filename.endswith(".json"):
+                    json.dump(rows, f)
+                else:
+                    writer = csv.DictWriter(f, fieldnames=(
+                        "group", "value", "revenue", "units", "lines"))
+                    writer.writeheader()
+                    writer.writerows(rows)
+        except OSError as e:
+            print(f"Error writing the file {filename}: {e}")
+
+
+def result_name(sales_file: str) -> str:
+    """
+    Name of the results directory of a sales file.
+
+    Args:
+        sales_file (str): Path of the sales file.
+
+    Returns:
+        str: File name up to its first dot, e.g. TC1 for TC1.Sales.json.
+    """
+    return sales_file.split('/')[-1].split('.')[0]
+
+
+def parse_arguments(argv: list, flag_options: tuple = FLAG_OPTIONS,
+                    value_options: tuple = VALUE_OPTIONS) -> tuple:
+    """
+    Split the command line arguments into positional arguments and options.
+
+    Args:
+        argv (list): Command line arguments without the script name.
+        flag_options (tuple): Options without a value.
+        value_options (tuple): Options followed by a value.
+
+    Returns:
+        tuple: List of positional arguments and dictionary of options, or
+        None if an option is unknown or misses its value.
+    """
+    positional = []
+    options = {}
+    args = iter(argv)
+    for arg in args:
+        if arg in flag_options:
+            options[arg[2:]] = True
+        elif arg in value_options:
+            value = next(args, None)
+            if value is None:
+                print(f"Error: Option {arg} requires a value.")
+                return None
+            options[arg[2:]] = value
+        elif arg.startswith("--"):
+            print(f"Error: Unknown option {arg}.")
+            return None
+        else:
+            positional.append(arg)
+    return positional, options
+
+
+def parse_engine_options(options: dict) -> tuple | None:
+    """
+    Validate the --workers and --engine options.
+
+    Args:
+        options (dict): Options returned by parse_arguments.
+
+    Returns:
+        tuple | None: Number of workers and engine name, or None if one of
+        them is invalid.
+    """
+    try:
+        workers = int(options.get("workers", 1))
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        print("Error: --workers must be a positive integer.")
+        return None
+    engine = options.get("engine", "scalar")
+    if engine not in ENGINES:
+        print(f"Error: --engine must be one of {', '.join(ENGINES)}.")
+        return None
+    return workers, engine
+
 
 def main():
     """
     Main function to compute the total cost of sales.
     """
-    if len(sys.argv) != 3:  # Check the number of arguments
+    arguments = parse_arguments(sys.argv[1:])
+    if arguments is None:
+        return
+    args, options = arguments
+    if len(args) != 2:  # Check the number of arguments
         print("Error: Invalid quantity of arguments. Please check.")
     else:
+        engine_options = parse_engine_options(options)
+        if engine_options is None:
+            return
+        workers, engine = engine_options
+        group_by = ()
+        if "report" in options:
+            group_by = ("Product",) + tuple(
+                field for field in options.get("group-by", "").split(",")
+                if field and field != "Product")
+        txt_filename = result_name(args[1])
+        checkpoint_file = None
+        if options.get("incremental", False):
+            checkpoint_file = (f"results/{txt_filename}/"
+                               "SalesResults.checkpoint.json")
         start_time = time.time()
-        compute_sales = ComputeSales(sys.argv[1], sys.argv[2])
-        file_ = sys.argv[2]
-        txt_filename = file_.split('/')[-1].split('.')[0]
+        compute_sales = ComputeSales(args[0], args[1],
+                                     streaming=options.get("stream", False),
+                                     workers=workers, group_by=group_by,
+                                     engine=engine,
+                                     catalogue_cache=not options.get(
+                                         "no-cache", False),
+                                     checkpoint_file=checkpoint_file)
         compute_sales.load_data()
         compute_sales.compute_total_cost()
         execution_time = time.time() - start_time
         compute_sales.save_results(f"results/{txt_filename}/SalesResults.txt",
                                    execution_time)
+        if "report" in options:
+            compute_sales.save_report(options["report"])
 
 
 if __name__ == "__main__":